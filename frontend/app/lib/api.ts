@@ -34,6 +34,8 @@ export async function apiFetch<T>(
     const base = getApiBaseUrl().replace(/\/$/, "");
     const url = `${base}/api/v1${path.startsWith("/") ? path : `/${path}`}`;
     const res = await fetch(url, {
+      // Send the API's cookies cross-origin: after a write it pins this client's reads to the primary database
+      credentials: "include",
       ...options,
       headers: {
         "Content-Type": "application/json",
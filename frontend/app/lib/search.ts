@@ -3,9 +3,10 @@ import type { Beneficiary } from "@/components/beneficiaries/types";
 import type { Program } from "@/components/programs/types";
 import type { Project } from "@/components/projects/types";
 
+/** Search hits carry only the fields the dropdown renders. */
 export type SearchResponse = {
-  projects: Project[];
-  programs: Program[];
-  applications: Application[];
-  beneficiaries: Beneficiary[];
+  projects: Pick<Project, "project_code" | "project_name">[];
+  programs: Pick<Program, "project_prog_id" | "mc_ref">[];
+  applications: Pick<Application, "app_id" | "prequalification_no" | "last_name" | "first_name">[];
+  beneficiaries: Pick<Beneficiary, "id" | "bin" | "last_name" | "first_name" | "common_code">[];
 };
@@ -11,6 +11,7 @@ from typing import Sequence, Union
 
 from alembic import op
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
 
 revision: str = "015"
 down_revision: Union[str, Sequence[str], None] = "014"
@@ -32,28 +33,22 @@ def _load_csv(name: str) -> list[dict]:
     return rows
 
 
+# (csv file, table, columns); one batched multi-row INSERT per table instead of one statement per row
+_SEEDS = (
+    ("adm1_regions.csv", "address_regions", ("adm1_pcode", "adm1_en", "adm0_pcode")),
+    ("adm2_provinces.csv", "address_provinces", ("adm2_pcode", "adm2_en", "adm1_pcode")),
+    ("adm3_municipalities.csv", "address_municipalities", ("adm3_pcode", "adm3_en", "adm2_pcode")),
+    ("adm4_barangays.csv", "address_barangays", ("adm4_pcode", "adm4_en", "adm3_pcode")),
+)
+
+
 def upgrade() -> None:
     conn = op.get_bind()
-    ins_regions = sa.text(
-        "INSERT INTO address_regions (adm1_pcode, adm1_en, adm0_pcode) VALUES (:adm1_pcode, :adm1_en, :adm0_pcode) ON CONFLICT (adm1_pcode) DO NOTHING"
-    )
-    for r in _load_csv("adm1_regions.csv"):
-        conn.execute(ins_regions, {"adm1_pcode": r.get("adm1_pcode", ""), "adm1_en": r.get("adm1_en", ""), "adm0_pcode": r.get("adm0_pcode", "")})
-    ins_provinces = sa.text(
-        "INSERT INTO address_provinces (adm2_pcode, adm2_en, adm1_pcode) VALUES (:adm2_pcode, :adm2_en, :adm1_pcode) ON CONFLICT (adm2_pcode) DO NOTHING"
-    )
-    for r in _load_csv("adm2_provinces.csv"):
-        conn.execute(ins_provinces, {"adm2_pcode": r.get("adm2_pcode", ""), "adm2_en": r.get("adm2_en", ""), "adm1_pcode": r.get("adm1_pcode", "")})
-    ins_municipalities = sa.text(
-        "INSERT INTO address_municipalities (adm3_pcode, adm3_en, adm2_pcode) VALUES (:adm3_pcode, :adm3_en, :adm2_pcode) ON CONFLICT (adm3_pcode) DO NOTHING"
-    )
-    for r in _load_csv("adm3_municipalities.csv"):
-        conn.execute(ins_municipalities, {"adm3_pcode": r.get("adm3_pcode", ""), "adm3_en": r.get("adm3_en", ""), "adm2_pcode": r.get("adm2_pcode", "")})
-    ins_barangays = sa.text(
-        "INSERT INTO address_barangays (adm4_pcode, adm4_en, adm3_pcode) VALUES (:adm4_pcode, :adm4_en, :adm3_pcode) ON CONFLICT (adm4_pcode) DO NOTHING"
-    )
-    for r in _load_csv("adm4_barangays.csv"):
-        conn.execute(ins_barangays, {"adm4_pcode": r.get("adm4_pcode", ""), "adm4_en": r.get("adm4_en", ""), "adm3_pcode": r.get("adm3_pcode", "")})
+    for fname, table_name, columns in _SEEDS:
+        table = sa.table(table_name, *(sa.column(c) for c in columns))
+        rows = [{c: r.get(c, "") for c in columns} for r in _load_csv(fname)]
+        if rows:
+            conn.execute(postgresql.insert(table).on_conflict_do_nothing(index_elements=[columns[0]]), rows)
 
 
 def downgrade() -> None:
@@ -0,0 +1,65 @@
+"""add pg_trgm and prefix indexes for global search
+
+Revision ID: 019
+Revises: 018
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "019"
+down_revision: Union[str, Sequence[str], None] = "018"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, column) for substring/similarity matching on names
+_TRGM_INDEXES = (
+    ("ix_projects_project_name_trgm", "projects", "project_name"),
+    ("ix_programs_mc_ref_trgm", "programs", "mc_ref"),
+    ("ix_applications_last_name_trgm", "applications", "last_name"),
+    ("ix_applications_first_name_trgm", "applications", "first_name"),
+    ("ix_beneficiaries_last_name_trgm", "beneficiaries", "last_name"),
+    ("ix_beneficiaries_first_name_trgm", "beneficiaries", "first_name"),
+)
+
+# (index name, table, column) for case-insensitive prefix matching on codes: lower(col) LIKE 'abc%'
+_PREFIX_INDEXES = (
+    ("ix_projects_project_code_prefix", "projects", "project_code"),
+    ("ix_applications_prequalification_no_prefix", "applications", "prequalification_no"),
+    ("ix_beneficiaries_bin_prefix", "beneficiaries", "bin"),
+    ("ix_beneficiaries_common_code_prefix", "beneficiaries", "common_code"),
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Search only ever looks at non-deleted rows, so the indexes are partial
+    for name, table, column in _TRGM_INDEXES:
+        op.create_index(
+            name,
+            table,
+            [column],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+            postgresql_where=sa.text("deleted_at IS NULL"),
+        )
+    for name, table, column in _PREFIX_INDEXES:
+        op.create_index(
+            name,
+            table,
+            [sa.text(f"lower({column}) text_pattern_ops")],
+            unique=False,
+            postgresql_where=sa.text("deleted_at IS NULL"),
+        )
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(_PREFIX_INDEXES):
+        op.drop_index(name, table_name=table)
+    for name, table, _ in reversed(_TRGM_INDEXES):
+        op.drop_index(name, table_name=table)
+    # pg_trgm is left installed; other objects may depend on it
@@ -0,0 +1,206 @@
+"""create search_index table kept in sync by triggers
+
+/search reads only search_index from here on, so the name trigram and prequalification_no prefix indexes of
+019 are dropped: they would only slow writes to the largest tables. The project indexes (list_projects) and the
+bin/common_code prefix indexes (bulk import matching) stay.
+
+Revision ID: 020
+Revises: 019
+Create Date: 2026-10-18
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "020"
+down_revision: Union[str, Sequence[str], None] = "019"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# entity_type -> (table, key expression, code, title, subtitle, extra) as SQL over a row alias "r"
+_ENTITIES = {
+    "projects": ("projects", "r.project_code", "r.project_code", "r.project_name", "NULL", "NULL"),
+    "programs": ("programs", "r.project_prog_id::text", "r.mc_ref", "NULL", "NULL", "NULL"),
+    "applications": (
+        "applications",
+        "r.app_id::text",
+        "r.prequalification_no",
+        "r.last_name",
+        "r.first_name",
+        "NULL",
+    ),
+    "beneficiaries": ("beneficiaries", "r.id::text", "r.bin", "r.last_name", "r.first_name", "r.common_code"),
+}
+
+# 019 indexes nothing reads once search moves to search_index: (index name, table, column, kind)
+_UNUSED_019_INDEXES = (
+    ("ix_programs_mc_ref_trgm", "programs", "mc_ref", "trgm"),
+    ("ix_applications_last_name_trgm", "applications", "last_name", "trgm"),
+    ("ix_applications_first_name_trgm", "applications", "first_name", "trgm"),
+    ("ix_beneficiaries_last_name_trgm", "beneficiaries", "last_name", "trgm"),
+    ("ix_beneficiaries_first_name_trgm", "beneficiaries", "first_name", "trgm"),
+    ("ix_applications_prequalification_no_prefix", "applications", "prequalification_no", "prefix"),
+)
+
+
+def _indexed_columns(entity_type: str) -> list[str]:
+    """Source columns the entity's search_index row is built from (plus deleted_at)."""
+    columns = []
+    for expression in _ENTITIES[entity_type][1:]:
+        columns += [c for c in re.findall(r"\br\.(\w+)", expression) if c not in columns]
+    return columns + ["deleted_at"]
+
+
+def _select(entity_type: str, source: str) -> str:
+    _, key, code, title, subtitle, extra = _ENTITIES[entity_type]
+    return f"""
+        SELECT '{entity_type}', {key}, {code}, {title}, {subtitle}, {extra},
+               search_normalize(concat_ws(' ', {code}, {title}, {subtitle}, {extra})),
+               r.deleted_at IS NOT NULL, now()
+        FROM {source}
+    """
+
+
+_UPSERT_COLUMNS = "(entity_type, entity_key, code, title, subtitle, extra, search_text, deleted, updated_at)"
+_ON_CONFLICT = """
+    ON CONFLICT (entity_type, entity_key) DO UPDATE SET
+        code = EXCLUDED.code, title = EXCLUDED.title, subtitle = EXCLUDED.subtitle, extra = EXCLUDED.extra,
+        search_text = EXCLUDED.search_text, deleted = EXCLUDED.deleted, updated_at = EXCLUDED.updated_at
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "search_index",
+        sa.Column("entity_type", sa.String(20), nullable=False),
+        sa.Column("entity_key", sa.String(64), nullable=False),
+        sa.Column("code", sa.Text(), nullable=True),
+        sa.Column("title", sa.Text(), nullable=True),
+        sa.Column("subtitle", sa.Text(), nullable=True),
+        sa.Column("extra", sa.Text(), nullable=True),
+        sa.Column("search_text", sa.Text(), nullable=False, server_default=""),
+        sa.Column("deleted", sa.Boolean(), nullable=False, server_default=sa.text("false")),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.PrimaryKeyConstraint("entity_type", "entity_key"),
+    )
+
+    # Lowercase and fold Spanish/Filipino accents (ñ -> n) so "Peñaflor" and "penaflor" index alike
+    op.execute("""
+        CREATE FUNCTION search_normalize(value text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+            SELECT lower(translate(coalesce(value, ''), 'ñÑáÁàÀâÂéÉèÈêÊíÍìÌîÎóÓòÒôÔúÚùÙûÛüÜ',
+                                                        'nNaAaAaAeEeEeEiIiIiIoOoOoOuUuUuUuU'))
+        $$
+    """)
+
+    op.create_index(
+        "ix_search_index_search_text_trgm",
+        "search_index",
+        ["search_text"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"search_text": "gin_trgm_ops"},
+        postgresql_where=sa.text("NOT deleted"),
+    )
+    op.create_index(
+        "ix_search_index_code_prefix",
+        "search_index",
+        ["entity_type", sa.text("lower(code) text_pattern_ops")],
+        unique=False,
+        postgresql_where=sa.text("NOT deleted"),
+    )
+    op.create_index(
+        "ix_search_index_extra_prefix",
+        "search_index",
+        ["entity_type", sa.text("lower(extra) text_pattern_ops")],
+        unique=False,
+        postgresql_where=sa.text("NOT deleted AND extra IS NOT NULL"),
+    )
+
+    for entity_type, (table, key, *_rest) in _ENTITIES.items():
+        old_key = key.replace("r.", "OLD.")
+        columns = _indexed_columns(entity_type)
+        old_row = ", ".join(f"OLD.{c}" for c in columns)
+        new_row = ", ".join(f"NEW.{c}" for c in columns)
+        # UPDATE OF fires whenever a listed column is in the SET list; the row comparison skips no-op rewrites
+        op.execute(f"""
+            CREATE FUNCTION search_index_sync_{table}() RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                IF TG_OP = 'UPDATE' AND ROW({old_row}) IS NOT DISTINCT FROM ROW({new_row}) THEN
+                    RETURN NEW;
+                END IF;
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    IF TG_OP = 'DELETE' OR {old_key} IS DISTINCT FROM {key.replace("r.", "NEW.")} THEN
+                        DELETE FROM search_index WHERE entity_type = '{entity_type}' AND entity_key = {old_key};
+                    END IF;
+                    IF TG_OP = 'DELETE' THEN
+                        RETURN OLD;
+                    END IF;
+                END IF;
+                INSERT INTO search_index {_UPSERT_COLUMNS}
+                {_select(entity_type, "(SELECT NEW.*) r")}
+                {_ON_CONFLICT};
+                RETURN NEW;
+            END
+            $$
+        """)
+        op.execute(f"""
+            CREATE TRIGGER trg_search_index_{table}
+            AFTER INSERT OR UPDATE OF {", ".join(columns)} OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION search_index_sync_{table}()
+        """)
+
+    # Full rebuild (used for the initial backfill and by app.services.search_index)
+    body = ";\n".join(
+        f"INSERT INTO search_index {_UPSERT_COLUMNS} {_select(entity_type, f'{table} r')} {_ON_CONFLICT}"
+        for entity_type, (table, *_rest) in _ENTITIES.items()
+    )
+    op.execute(f"""
+        CREATE FUNCTION search_index_rebuild() RETURNS bigint
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            DELETE FROM search_index;
+            {body};
+            RETURN (SELECT count(*) FROM search_index);
+        END
+        $$
+    """)
+    op.execute("SELECT search_index_rebuild()")
+
+    for name, table, *_rest in _UNUSED_019_INDEXES:
+        op.drop_index(name, table_name=table)
+
+
+def downgrade() -> None:
+    for name, table, column, kind in _UNUSED_019_INDEXES:
+        if kind == "trgm":
+            op.create_index(
+                name,
+                table,
+                [column],
+                unique=False,
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+                postgresql_where=sa.text("deleted_at IS NULL"),
+            )
+        else:
+            op.create_index(
+                name,
+                table,
+                [sa.text(f"lower({column}) text_pattern_ops")],
+                unique=False,
+                postgresql_where=sa.text("deleted_at IS NULL"),
+            )
+    op.execute("DROP FUNCTION IF EXISTS search_index_rebuild()")
+    for _, (table, *_rest) in _ENTITIES.items():
+        op.execute(f"DROP TRIGGER IF EXISTS trg_search_index_{table} ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS search_index_sync_{table}()")
+    op.drop_index("ix_search_index_extra_prefix", table_name="search_index")
+    op.drop_index("ix_search_index_code_prefix", table_name="search_index")
+    op.drop_index("ix_search_index_search_text_trgm", table_name="search_index")
+    op.execute("DROP FUNCTION IF EXISTS search_normalize(text)")
+    op.drop_table("search_index")
@@ -0,0 +1,105 @@
+"""add normalized and phonetic name keys for duplicate detection
+
+Maintenance-window migration: adding the STORED generated columns rewrites beneficiaries and applications under
+an ACCESS EXCLUSIVE lock, so reads and writes on both tables block until it finishes.
+
+Revision ID: 021
+Revises: 020
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "021"
+down_revision: Union[str, Sequence[str], None] = "020"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_TABLES = ("beneficiaries", "applications")
+
+# Stored generated columns: kept in sync by Postgres on every write, including COPY and raw SQL
+_COLUMNS = (
+    ("last_name_key", "replace(person_name_key(last_name), ' ', '')"),
+    ("first_name_key", "person_name_key(first_name)"),
+    (
+        "name_phonetic",
+        "name_phonetic(replace(person_name_key(last_name), ' ', '')) || ':' "
+        "|| coalesce(name_phonetic(split_part(person_name_key(first_name), ' ', 1)), '')",
+    ),
+)
+
+
+def upgrade() -> None:
+    # The nested call is schema-qualified: pg_dump restores with an empty search_path, and recomputing the
+    # generated columns during COPY would not find an unqualified search_normalize()
+    schema = op.get_bind().execute(sa.text("SELECT quote_ident(current_schema())")).scalar_one()
+    # Given-name style key: search_normalize (ñ -> n, lowercase), punctuation to spaces, "Ma." -> maria,
+    # Sto./Sta. expanded, generational suffixes dropped. Surname keys additionally drop spaces so
+    # "De La Cruz", "dela Cruz" and "Delacruz" agree.
+    op.execute(r"""
+        CREATE FUNCTION person_name_key(value text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+            SELECT nullif(trim(regexp_replace(
+                regexp_replace(regexp_replace(regexp_replace(regexp_replace(
+                    regexp_replace(%s.search_normalize(value), '[^a-z0-9]+', ' ', 'g'),
+                    '\mma\M', 'maria', 'g'),
+                    '\msto\M', 'santo', 'g'),
+                    '\msta\M', 'santa', 'g'),
+                    '\m(jr|sr|ii|iii|iv)\M', '', 'g'),
+                '\s+', ' ', 'g')), '')
+        $$
+    """ % schema)
+    # Phonetic key for a single normalized word, tuned for Spanish/Filipino spellings: ph/f, qu/c/k/q,
+    # z/s, v/b, j/h, w/u, y/i are merged, doubled letters collapse and vowels after the first letter drop
+    # (Villanueva = Vilanueba, Cruz = Kruz, Jhon = John)
+    op.execute(r"""
+        CREATE FUNCTION name_phonetic(value text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+            SELECT nullif(left(s, 1) || regexp_replace(substr(s, 2), '[aeiouh]', '', 'g'), '')
+            FROM (
+                SELECT regexp_replace(
+                    translate(
+                        regexp_replace(regexp_replace(regexp_replace(regexp_replace(regexp_replace(
+                            coalesce(value, ''),
+                            'ph', 'f', 'g'),
+                            'qu', 'k', 'g'),
+                            'gu([ei])', 'g\1', 'g'),
+                            'c([eiy])', 's\1', 'g'),
+                            'x', 'ks', 'g'),
+                        'cqzvjwy', 'kksbhui'),
+                    '(.)\1+', '\1', 'g') AS s
+            ) t
+        $$
+    """)
+
+    for table in _TABLES:
+        for column, expression in _COLUMNS:
+            op.add_column(table, sa.Column(column, sa.Text(), sa.Computed(expression, persisted=True), nullable=True))
+        # Blocking keys for candidate lookup: same birth date, or same phonetic surname + given name
+        op.create_index(
+            f"ix_{table}_birth_date_active",
+            table,
+            ["birth_date"],
+            unique=False,
+            postgresql_where=sa.text("deleted_at IS NULL"),
+        )
+        op.create_index(
+            f"ix_{table}_name_phonetic",
+            table,
+            ["name_phonetic"],
+            unique=False,
+            postgresql_where=sa.text("deleted_at IS NULL"),
+        )
+
+
+def downgrade() -> None:
+    for table in reversed(_TABLES):
+        op.drop_index(f"ix_{table}_name_phonetic", table_name=table)
+        op.drop_index(f"ix_{table}_birth_date_active", table_name=table)
+        for column, _ in reversed(_COLUMNS):
+            op.drop_column(table, column)
+    op.execute("DROP FUNCTION IF EXISTS name_phonetic(text)")
+    op.execute("DROP FUNCTION IF EXISTS person_name_key(text)")
@@ -0,0 +1,49 @@
+"""add partial indexes on lookup and sort keys of soft-deleted tables
+
+Revision ID: 022
+Revises: 021
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "022"
+down_revision: Union[str, Sequence[str], None] = "021"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns). Every router read filters deleted_at IS NULL, so the indexes cover only live
+# rows: smaller than full indexes, and the planner can use them without rechecking deleted_at.
+# Keyset pagination walks the primary key btrees, which already serve it: a partial copy would only add write
+# cost (pages fetch from the heap anyway) unless most rows were deleted.
+_INDEXES = (
+    # projects list filters (region/province prefixes are indexed by 023)
+    ("ix_projects_active_program_approval", "projects", ["project_prog_id", "approval_status"]),
+    ("ix_projects_active_approval_status", "projects", ["approval_status"]),
+    ("ix_programs_active_approval_status", "programs", ["approval_status"]),
+    # name lookups and sorting, newest-first application queues
+    ("ix_applications_active_created_at", "applications", ["created_at"]),
+    ("ix_applications_active_name", "applications", ["last_name", "first_name"]),
+    ("ix_beneficiaries_active_name", "beneficiaries", ["last_name", "first_name"]),
+    ("ix_beneficiaries_active_app_id", "beneficiaries", ["app_id"]),
+    ("ix_beneficiaries_active_location", "beneficiaries", ["region_code", "province_code", "municipal_code"]),
+)
+
+
+def upgrade() -> None:
+    for name, table, columns in _INDEXES:
+        op.create_index(
+            name,
+            table,
+            columns,
+            unique=False,
+            postgresql_where=sa.text("deleted_at IS NULL"),
+        )
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(_INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,40 @@
+"""add prefix indexes for project region/province filters
+
+Revision ID: 023
+Revises: 022
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "023"
+down_revision: Union[str, Sequence[str], None] = "022"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # list_projects matches region/province PSGC codes by prefix (region_code LIKE 'PH04%'); pattern ops let
+    # the btree serve LIKE prefixes under any database collation, and still serve equality
+    op.create_index(
+        "ix_projects_active_region_province_prefix",
+        "projects",
+        [sa.text("region_code varchar_pattern_ops"), sa.text("province_code varchar_pattern_ops")],
+        unique=False,
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+    op.create_index(
+        "ix_projects_active_province_prefix",
+        "projects",
+        [sa.text("province_code varchar_pattern_ops")],
+        unique=False,
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_projects_active_province_prefix", table_name="projects")
+    op.drop_index("ix_projects_active_region_province_prefix", table_name="projects")
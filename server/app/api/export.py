@@ -0,0 +1,43 @@
+"""
+Streaming export endpoints shared helper: ?format=csv|xlsx over a model's response-schema columns.
+"""
+
+from datetime import date
+
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from app.database import session_for
+from app.services.export_service import EXPORT_FORMATS, iter_csv, iter_xlsx, stream_rows
+
+# Columns never exported (large blobs)
+_EXCLUDED_FIELDS = {"valid_id_image"}
+
+
+def export_response(request: Request, model, schema, key_columns: tuple, fmt: str, name: str, where: tuple = ()):
+    """
+    StreamingResponse with every row of model matching where, ordered by key_columns, in schema field order
+    (key columns first). Rows are read through a server-side cursor while the response is being sent, on a session
+    the body opens and closes itself: a dependency's session can be closed before a streamed body is sent.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    keys = [c.key for c in key_columns]
+    fields = keys + [f for f in schema.model_fields if f not in keys and f not in _EXCLUDED_FIELDS]
+    statement = select(*(getattr(model, f) for f in fields)).where(*where).order_by(*key_columns)
+
+    def chunks():
+        db = session_for(request)
+        try:
+            yield from stream_rows(db, statement)
+        finally:
+            db.close()
+
+    body = iter_csv(fields, chunks()) if fmt == "csv" else iter_xlsx(fields, chunks(), sheet_name=name)
+    filename = f"{name}-{date.today().isoformat()}.{fmt}"
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
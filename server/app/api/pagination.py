@@ -0,0 +1,113 @@
+"""
+Keyset (cursor) pagination shared by the list endpoints.
+
+Rows are ordered by a unique, non-null key (the primary key) and each page continues after the last key of the
+previous one, so deep pages cost the same as the first and rows never shift or repeat between pages. The opaque
+cursor for the next page is returned in the X-Next-Cursor response header (absent on the last page), which
+keeps list bodies plain JSON arrays for existing clients.
+
+With include_total the row count goes in X-Total-Count: exact for filtered queries and small tables, and
+estimated from planner statistics (pg_class.reltuples scaled by the non-deleted fraction) for unfiltered
+listings of large tables, flagged by X-Total-Count-Exact: false.
+"""
+
+import base64
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from fastapi import HTTPException, Response
+from sqlalchemy import literal, text, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_EXACT_HEADER = "X-Total-Count-Exact"
+MAX_PAGE_SIZE = 1000
+
+# Below this many (estimated) rows an exact count is cheap enough to always run
+_EXACT_COUNT_BELOW = 10_000
+
+# Live-row estimate: reltuples (-1 if never analyzed) times the share of rows whose deleted_at is NULL
+_ESTIMATE_SQL = text("""
+    SELECT c.reltuples, s.null_frac
+    FROM pg_class c
+    LEFT JOIN pg_stats s
+        ON s.schemaname = current_schema() AND s.tablename = c.relname AND s.attname = 'deleted_at'
+    WHERE c.oid = to_regclass(:table)
+""")
+
+# Key value types as they appear in JSON -> Python value expected by the column
+_DECODERS = {
+    int: int,
+    str: str,
+    Decimal: Decimal,
+    uuid.UUID: uuid.UUID,
+    date: date.fromisoformat,
+    datetime: datetime.fromisoformat,
+}
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps([v if isinstance(v, (int, str)) else str(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, key_columns: tuple) -> list:
+    """Cursor -> key values typed for key_columns; 400 if it was not produced for this key."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(key_columns):
+            raise ValueError("key length mismatch")
+        return [_DECODERS[column.type.python_type](value) for column, value in zip(key_columns, values)]
+    except (ValueError, TypeError, KeyError, ArithmeticError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(q, key_columns: tuple, response: Response, cursor: str | None, limit: int, skip: int = 0) -> list:
+    """
+    One page of q ordered by key_columns. Continues after cursor when given; skip is honoured only for the
+    first page (legacy offset clients). Sets X-Next-Cursor when more rows follow.
+    """
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+    q = q.order_by(*key_columns)
+    if cursor:
+        values = decode_cursor(cursor, key_columns)
+        if len(key_columns) == 1:
+            q = q.filter(key_columns[0] > values[0])
+        else:
+            bound = tuple_(*(literal(value, column.type) for column, value in zip(key_columns, values)))
+            q = q.filter(tuple_(*key_columns) > bound)
+    elif skip:
+        q = q.offset(skip)
+    items = q.limit(limit + 1).all()
+    if len(items) > limit:
+        items = items[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(items[-1], c.key) for c in key_columns])
+    return items
+
+
+def _estimate_rows(q) -> int | None:
+    table = q.column_descriptions[0]["entity"].__table__
+    row = q.session.execute(_ESTIMATE_SQL, {"table": table.name}).first()
+    if row is None or row.reltuples < _EXACT_COUNT_BELOW:
+        return None
+    if "deleted_at" not in table.c:
+        return round(row.reltuples)
+    if row.null_frac is None:
+        return None
+    return round(row.reltuples * row.null_frac)
+
+
+def set_total_count(q, response: Response, filtered: bool) -> None:
+    """
+    Put the row count of q (before pagination) in X-Total-Count. Unfiltered listings of large tables use the
+    statistics estimate; filtered queries, small tables and tables without statistics are counted exactly.
+    """
+    total = None if filtered else _estimate_rows(q)
+    exact = total is None
+    if exact:
+        total = q.order_by(None).count()
+    response.headers[TOTAL_COUNT_HEADER] = str(total)
+    response.headers[TOTAL_EXACT_HEADER] = "true" if exact else "false"
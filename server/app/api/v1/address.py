@@ -1,15 +1,21 @@
-"""Address API: regions, provinces, municipalities, barangays. Redis-first, then DB or CSV."""
+"""
+Address API: regions, provinces, municipalities, barangays. Redis-first, then DB or CSV.
+Reads use the primary even when a replica is configured: whatever they load is cached for days.
+"""
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, get_primary_db, writes_nothing
+from app.redis_client import address_cache_stats
 from app.schemas.address import (
     AddressBarangayCreate,
     AddressItemCreate,
     AddressItemUpdate,
     AddressMunicipalityCreate,
     AddressProvinceCreate,
+    AddressResolveRequest,
+    AddressResolveResult,
 )
 from app.services.address_service import (
     AddressConflictError,
@@ -21,10 +27,13 @@ from app.services.address_service import (
     delete_municipality,
     delete_province,
     delete_region,
+    get_address_tree,
     get_barangays,
     get_municipalities,
     get_provinces,
     get_regions,
+    resolve_codes,
+    search_addresses,
     update_barangay,
     update_municipality,
     update_province,
@@ -43,8 +52,66 @@ def _handle_address_error(e: Exception) -> None:
     raise e
 
 
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def _pick_encoding(accept_encoding: str | None, available: dict[str, bytes]) -> str:
+    accepted = {part.split(";")[0].strip().lower() for part in (accept_encoding or "").split(",")}
+    for encoding in ("br", "gzip"):
+        if encoding in accepted and encoding in available:
+            return encoding
+    return "identity"
+
+
+@router.get("/tree")
+def address_tree(
+    region_code: str | None = Query(None, alias="region_code"),
+    if_none_match: str | None = Header(None),
+    accept_encoding: str | None = Header(None),
+    db: Session = Depends(get_primary_db),
+) -> Response:
+    """
+    Whole hierarchy (optionally one region) in one payload:
+    { \"regions\": [[code, name, [[code, name, [[code, name, [[code, name], ...]]]]]]] }.
+    Strong ETag per content-coding; send If-None-Match to get 304. Body is precompressed (br when available,
+    else gzip). 404 for an unknown region_code.
+    """
+    region_code = region_code.strip() if region_code else None
+    # Checked against the cached region list first: unknown codes must not cost a build or a cache entry
+    if region_code and all(region["code"] != region_code for region in get_regions(db)):
+        raise HTTPException(status_code=404, detail="Region not found")
+    tree = get_address_tree(db, region_code)
+    encoding = _pick_encoding(accept_encoding, tree.bodies)
+    headers = {"ETag": tree.etags[encoding], "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if _etag_matches(if_none_match, tree.etags[encoding]):
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=tree.bodies[encoding], media_type="application/json", headers=headers)
+
+
+@router.post("/resolve", response_model=list[AddressResolveResult], dependencies=[Depends(writes_nothing)])
+def resolve_address_codes(payload: AddressResolveRequest, db: Session = Depends(get_db)) -> list[dict]:
+    """Validate parent/child consistency of up to 10,000 code tuples and return their names, in order."""
+    return resolve_codes(db, [item.model_dump() for item in payload.items])
+
+
+@router.get("/search")
+def search_address(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_primary_db),
+) -> list[dict]:
+    """Ranked name matches with full path: [{ \"level\", \"code\", \"name\", \"score\", \"region_code\", ... }]."""
+    return search_addresses(db, q, limit)
+
+
 @router.get("/regions")
-def list_regions(db: Session = Depends(get_db)) -> list[dict[str, str]]:
+def list_regions(db: Session = Depends(get_primary_db)) -> list[dict[str, str]]:
     """List all regions. Response: [{ \"code\", \"name\" }, ...]."""
     return get_regions(db)
 
@@ -79,7 +146,7 @@ def delete_region_route(code: str, db: Session = Depends(get_db)) -> None:
 @router.get("/provinces")
 def list_provinces(
     region_code: str = Query(..., alias="region_code"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_primary_db),
 ) -> list[dict[str, str]]:
     """List provinces for a region. Response: [{ \"code\", \"name\" }, ...]."""
     return get_provinces(region_code, db)
@@ -120,7 +187,7 @@ def delete_province_route(code: str, db: Session = Depends(get_db)) -> None:
 @router.get("/municipalities")
 def list_municipalities(
     province_code: str = Query(..., alias="province_code"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_primary_db),
 ) -> list[dict[str, str]]:
     """List municipalities for a province. Response: [{ \"code\", \"name\" }, ...]."""
     return get_municipalities(province_code, db)
@@ -161,7 +228,7 @@ def delete_municipality_route(code: str, db: Session = Depends(get_db)) -> None:
 @router.get("/barangays")
 def list_barangays(
     municipal_code: str = Query(..., alias="municipal_code"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_primary_db),
 ) -> list[dict[str, str]]:
     """List barangays for a municipality. Response: [{ \"code\", \"name\" }, ...]."""
     return get_barangays(municipal_code, db)
@@ -199,8 +266,13 @@ def delete_barangay_route(code: str, db: Session = Depends(get_db)) -> None:
         _handle_address_error(e)
 
 
-@router.post("/warm")
-def warm_cache(db: Session = Depends(get_db)) -> dict[str, str]:
-    """Preload all address data into Redis from DB/CSV. No-op if Redis unavailable."""
-    warm_address_cache(db)
-    return {"status": "ok"}
+@router.post("/warm", dependencies=[Depends(writes_nothing)])
+def warm_cache(db: Session = Depends(get_db)) -> dict:
+    """Bulk-preload all address data into the cache from DB/CSV. Response: per-level counts and elapsed_ms."""
+    return {"status": "ok", **warm_address_cache(db)}
+
+
+@router.get("/cache/stats")
+def cache_stats() -> dict:
+    """Address cache counters (L1 hits, Redis hits, misses, errors, circuit trips) and Redis state."""
+    return address_cache_stats()
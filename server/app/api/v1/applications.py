@@ -1,12 +1,16 @@
 from datetime import datetime, timezone
+from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.api.export import export_response
+from app.api.pagination import paginate, set_total_count
+from app.database import AsyncDB, get_async_db, get_db
 from app.models.application import Application
 from app.schemas.application import ApplicationCreate, ApplicationResponse, ApplicationUpdate
+from app.services.search_cache import invalidate_search
 
 router = APIRouter()
 
@@ -16,13 +20,36 @@ def _not_deleted(q):
 
 
 @router.get("/", response_model=list[ApplicationResponse])
-def list_applications(
+async def list_applications(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncDB = Depends(get_async_db),
 ):
-    items = _not_deleted(db.query(Application)).offset(skip).limit(limit).all()
-    return items
+    def query(db: Session):
+        q = _not_deleted(db.query(Application))
+        items = paginate(q, (Application.app_id,), response, cursor, limit, skip)
+        if include_total:
+            set_total_count(q, response, filtered=False)
+        return items
+
+    return await db.run(query)
+
+
+@router.get("/export")
+def export_applications(request: Request, format: str = "csv"):
+    """Stream all non-deleted applications as CSV or XLSX (server-side cursor, constant memory)."""
+    return export_response(
+        request,
+        Application,
+        ApplicationResponse,
+        (Application.app_id,),
+        format,
+        "applications",
+        where=(Application.deleted_at.is_(None),),
+    )
 
 
 @router.get("/{app_id}", response_model=ApplicationResponse)
@@ -38,6 +65,7 @@ def create_application(payload: ApplicationCreate, db: Session = Depends(get_db)
     app = Application(**payload.model_dump())
     db.add(app)
     db.commit()
+    invalidate_search("applications")
     db.refresh(app)
     return app
 
@@ -55,6 +83,7 @@ def update_application(
     for key, value in data.items():
         setattr(app, key, value)
     db.commit()
+    invalidate_search("applications")
     db.refresh(app)
     return app
 
@@ -66,4 +95,5 @@ def delete_application(app_id: UUID, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Application not found")
     app.deleted_at = datetime.now(timezone.utc)
     db.commit()
+    invalidate_search("applications")
     return None
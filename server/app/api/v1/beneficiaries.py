@@ -1,11 +1,23 @@
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.api.export import export_response
+from app.api.pagination import paginate, set_total_count
+from app.database import AsyncDB, get_async_db, get_db
 from app.models.beneficiary import Beneficiary
-from app.schemas.beneficiary import BeneficiaryCreate, BeneficiaryResponse, BeneficiaryUpdate
+from app.schemas.beneficiary import (
+    BeneficiaryCreate,
+    BeneficiaryResponse,
+    BeneficiaryUpdate,
+    DuplicateCandidate,
+)
+from app.schemas.bulk import BulkRequest, BulkResult
+from app.services.bulk_service import bulk_write
+from app.services.duplicate_service import find_duplicates, probe_keys
+from app.services.search_cache import invalidate_search
 
 router = APIRouter()
 
@@ -15,13 +27,65 @@ def _not_deleted(q):
 
 
 @router.get("/", response_model=list[BeneficiaryResponse])
-def list_beneficiaries(
+async def list_beneficiaries(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncDB = Depends(get_async_db),
+):
+    def query(db: Session):
+        q = _not_deleted(db.query(Beneficiary))
+        items = paginate(q, (Beneficiary.id,), response, cursor, limit, skip)
+        if include_total:
+            set_total_count(q, response, filtered=False)
+        return items
+
+    return await db.run(query)
+
+
+@router.get("/export")
+def export_beneficiaries(request: Request, format: str = "csv"):
+    """Stream all non-deleted beneficiaries as CSV or XLSX (server-side cursor, constant memory)."""
+    return export_response(
+        request,
+        Beneficiary,
+        BeneficiaryResponse,
+        (Beneficiary.id,),
+        format,
+        "beneficiaries",
+        where=(Beneficiary.deleted_at.is_(None),),
+    )
+
+
+@router.get("/duplicates", response_model=list[DuplicateCandidate])
+def list_duplicate_candidates(
+    last_name: str | None = None,
+    first_name: str | None = None,
+    middle_name: str | None = None,
+    birth_date: date | None = None,
+    beneficiary_id: int | None = None,
+    min_score: float = 0.6,
+    limit: int = 20,
     db: Session = Depends(get_db),
 ):
-    items = _not_deleted(db.query(Beneficiary)).offset(skip).limit(limit).all()
-    return items
+    """
+    Beneficiaries and applications that likely are the same person, best first. Pass names/birth_date of a
+    new record, or beneficiary_id to check an existing one.
+    """
+    exclude = None
+    if beneficiary_id is not None:
+        item = _not_deleted(db.query(Beneficiary)).filter(Beneficiary.id == beneficiary_id).first()
+        if not item:
+            raise HTTPException(status_code=404, detail="Beneficiary not found")
+        last_name, first_name, middle_name = item.last_name, item.first_name, item.middle_name
+        birth_date = item.birth_date
+        exclude = ("beneficiary", str(item.id))
+    if not last_name:
+        raise HTTPException(status_code=400, detail="last_name or beneficiary_id is required")
+    probe = probe_keys(db, last_name, first_name, middle_name, birth_date)
+    return find_duplicates(db, probe, limit=min(max(limit, 1), 100), min_score=min_score, exclude=exclude)
 
 
 @router.get("/{beneficiary_id}", response_model=BeneficiaryResponse)
@@ -37,10 +101,27 @@ def create_beneficiary(payload: BeneficiaryCreate, db: Session = Depends(get_db)
     item = Beneficiary(**payload.model_dump())
     db.add(item)
     db.commit()
+    invalidate_search("beneficiaries")
     db.refresh(item)
     return item
 
 
+@router.post("/bulk", response_model=BulkResult)
+def bulk_create_beneficiaries(payload: BulkRequest, db: Session = Depends(get_db)):
+    """
+    Create up to 5000 beneficiaries in one transaction; invalid rows are reported and skipped. With
+    mode="upsert", rows whose key ("bin" by default, or "common_code") matches a live beneficiary update it.
+    """
+    key = payload.key or "bin"
+    if payload.mode == "upsert" and key not in ("bin", "common_code"):
+        raise HTTPException(status_code=400, detail="key must be bin or common_code")
+    key_fields = (key,) if payload.mode == "upsert" else None
+    result = bulk_write(db, Beneficiary, BeneficiaryCreate, payload.items, key_fields)
+    if result["inserted"] or result["updated"]:
+        invalidate_search("beneficiaries")
+    return result
+
+
 @router.put("/{beneficiary_id}", response_model=BeneficiaryResponse)
 def update_beneficiary(
     beneficiary_id: int,
@@ -53,6 +134,7 @@ def update_beneficiary(
     for key, value in payload.model_dump(exclude_unset=True).items():
         setattr(item, key, value)
     db.commit()
+    invalidate_search("beneficiaries")
     db.refresh(item)
     return item
 
@@ -64,4 +146,5 @@ def delete_beneficiary(beneficiary_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Beneficiary not found")
     item.deleted_at = datetime.now(timezone.utc)
     db.commit()
+    invalidate_search("beneficiaries")
     return None
@@ -1,21 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.api.pagination import paginate, set_total_count
+from app.database import AsyncDB, get_async_db, get_db
+from app.models.beneficiary import Beneficiary
 from app.models.co_owner import CoOwner
+from app.schemas.bulk import BulkRequest, BulkResult
 from app.schemas.co_owner import CoOwnerCreate, CoOwnerResponse, CoOwnerUpdate
+from app.services.bulk_service import bulk_write
 
 router = APIRouter()
 
 
 @router.get("/", response_model=list[CoOwnerResponse])
-def list_co_owners(
+async def list_co_owners(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncDB = Depends(get_async_db),
 ):
-    items = db.query(CoOwner).offset(skip).limit(limit).all()
-    return items
+    def query(db: Session):
+        q = db.query(CoOwner)
+        items = paginate(q, (CoOwner.id,), response, cursor, limit, skip)
+        if include_total:
+            set_total_count(q, response, filtered=False)
+        return items
+
+    return await db.run(query)
 
 
 @router.get("/{co_owner_id}", response_model=CoOwnerResponse)
@@ -35,6 +50,16 @@ def create_co_owner(payload: CoOwnerCreate, db: Session = Depends(get_db)):
     return item
 
 
+@router.post("/bulk", response_model=BulkResult)
+def bulk_create_co_owners(payload: BulkRequest, db: Session = Depends(get_db)):
+    """
+    Create up to 5000 co-owners in one transaction; invalid rows (including unknown beneficiary_id) are
+    reported and skipped. With mode="upsert", rows matching an existing (beneficiary_id, sequence) update it.
+    """
+    key_fields = ("beneficiary_id", "sequence") if payload.mode == "upsert" else None
+    return bulk_write(db, CoOwner, CoOwnerCreate, payload.items, key_fields, {"beneficiary_id": Beneficiary.id})
+
+
 @router.put("/{co_owner_id}", response_model=CoOwnerResponse)
 def update_co_owner(
     co_owner_id: int,
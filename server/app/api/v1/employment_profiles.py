@@ -1,25 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.api.pagination import paginate, set_total_count
+from app.database import AsyncDB, get_async_db, get_db
+from app.models.beneficiary import Beneficiary
 from app.models.employment_profile import EmploymentProfile
+from app.schemas.bulk import BulkRequest, BulkResult
 from app.schemas.employment_profile import (
     EmploymentProfileCreate,
     EmploymentProfileResponse,
     EmploymentProfileUpdate,
 )
+from app.services.bulk_service import bulk_write
 
 router = APIRouter()
 
 
 @router.get("/", response_model=list[EmploymentProfileResponse])
-def list_employment_profiles(
+async def list_employment_profiles(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncDB = Depends(get_async_db),
 ):
-    items = db.query(EmploymentProfile).offset(skip).limit(limit).all()
-    return items
+    def query(db: Session):
+        q = db.query(EmploymentProfile)
+        items = paginate(q, (EmploymentProfile.id,), response, cursor, limit, skip)
+        if include_total:
+            set_total_count(q, response, filtered=False)
+        return items
+
+    return await db.run(query)
 
 
 @router.get("/{profile_id}", response_model=EmploymentProfileResponse)
@@ -41,6 +56,18 @@ def create_employment_profile(
     return item
 
 
+@router.post("/bulk", response_model=BulkResult)
+def bulk_create_employment_profiles(payload: BulkRequest, db: Session = Depends(get_db)):
+    """
+    Create up to 5000 employment profiles in one transaction; invalid rows (including unknown beneficiary_id)
+    are reported and skipped. With mode="upsert", a row for a beneficiary that already has a profile updates it.
+    """
+    key_fields = ("beneficiary_id",) if payload.mode == "upsert" else None
+    return bulk_write(
+        db, EmploymentProfile, EmploymentProfileCreate, payload.items, key_fields, {"beneficiary_id": Beneficiary.id}
+    )
+
+
 @router.put("/{profile_id}", response_model=EmploymentProfileResponse)
 def update_employment_profile(
     profile_id: int,
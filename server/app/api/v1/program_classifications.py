@@ -1,9 +1,11 @@
 from decimal import Decimal, InvalidOperation
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.api.pagination import paginate, set_total_count
+from app.database import AsyncDB, get_async_db, get_db
 from app.models.program_classification import ProgramClassification
 from app.schemas.program_classification import (
     ProgramClassificationCreate,
@@ -22,13 +24,22 @@ def _parse_program_class(value: str) -> Decimal:
 
 
 @router.get("/", response_model=list[ProgramClassificationResponse])
-def list_program_classifications(
+async def list_program_classifications(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncDB = Depends(get_async_db),
 ):
-    items = db.query(ProgramClassification).offset(skip).limit(limit).all()
-    return items
+    def query(db: Session):
+        q = db.query(ProgramClassification)
+        items = paginate(q, (ProgramClassification.program_class,), response, cursor, limit, skip)
+        if include_total:
+            set_total_count(q, response, filtered=False)
+        return items
+
+    return await db.run(query)
 
 
 @router.get("/{program_class}", response_model=ProgramClassificationResponse)
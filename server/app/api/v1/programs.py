@@ -1,12 +1,14 @@
 from datetime import datetime, timezone
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.api.pagination import paginate, set_total_count
+from app.database import AsyncDB, get_async_db, get_db
 from app.models.program import Program
 from app.schemas.program import ProgramCreate, ProgramResponse, ProgramUpdate
+from app.services.search_cache import invalidate_search
 
 router = APIRouter()
 
@@ -16,17 +18,25 @@ def _not_deleted(q):
 
 
 @router.get("/", response_model=list[ProgramResponse])
-def list_programs(
+async def list_programs(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     approval_status: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncDB = Depends(get_async_db),
 ):
-    q = _not_deleted(db.query(Program))
-    if approval_status is not None and approval_status.strip():
-        q = q.filter(Program.approval_status == approval_status.strip())
-    items = q.offset(skip).limit(limit).all()
-    return items
+    def query(db: Session):
+        q = unfiltered = _not_deleted(db.query(Program))
+        if approval_status is not None and approval_status.strip():
+            q = q.filter(Program.approval_status == approval_status.strip())
+        items = paginate(q, (Program.project_prog_id,), response, cursor, limit, skip)
+        if include_total:
+            set_total_count(q, response, filtered=q is not unfiltered)
+        return items
+
+    return await db.run(query)
 
 
 @router.get("/{project_prog_id}", response_model=ProgramResponse)
@@ -44,6 +54,7 @@ def create_program(payload: ProgramCreate, db: Session = Depends(get_db)):
     item = Program(**data)
     db.add(item)
     db.commit()
+    invalidate_search("programs")
     db.refresh(item)
     return item
 
@@ -60,6 +71,7 @@ def update_program(
     for key, value in payload.model_dump(exclude_unset=True).items():
         setattr(item, key, value)
     db.commit()
+    invalidate_search("programs")
     db.refresh(item)
     return item
 
@@ -81,6 +93,7 @@ def patch_program(
         if "approved_by" in data:
             item.approved_by = data["approved_by"]
     db.commit()
+    invalidate_search("programs")
     db.refresh(item)
     return item
 
@@ -92,4 +105,5 @@ def delete_program(project_prog_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Program not found")
     item.deleted_at = datetime.now(timezone.utc)
     db.commit()
+    invalidate_search("programs")
     return None
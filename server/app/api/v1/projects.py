@@ -1,12 +1,16 @@
 from datetime import datetime, timezone
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.api.pagination import paginate, set_total_count
+from app.database import AsyncDB, get_async_db, get_db
 from app.models.project import Project
 from app.schemas.project import ProjectCreate, ProjectResponse, ProjectUpdate
+from app.services.search_cache import invalidate_search
+from app.services.search_service import escape_like
 
 router = APIRouter()
 
@@ -15,10 +19,21 @@ def _not_deleted(q):
     return q.filter(Project.deleted_at.is_(None))
 
 
+def _psgc_prefix(value: str) -> str:
+    """LIKE prefix pattern for a PSGC code given with or without its "PH" prefix ("04", "ph0401", "PH04013")."""
+    code = value.strip().upper()
+    if not code.startswith("PH"):
+        code = f"PH{code}"
+    return f"{escape_like(code)}%"
+
+
 @router.get("/", response_model=list[ProjectResponse])
-def list_projects(
+async def list_projects(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     project_code: Optional[str] = None,
     project_name: Optional[str] = None,
     region_code: Optional[str] = None,
@@ -26,25 +41,32 @@ def list_projects(
     lot_type: Optional[str] = None,
     project_prog_id: Optional[int] = None,
     approval_status: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncDB = Depends(get_async_db),
 ):
-    q = _not_deleted(db.query(Project))
-    if project_code is not None and project_code.strip():
-        q = q.filter(Project.project_code.ilike(f"%{project_code.strip()}%"))
-    if project_name is not None and project_name.strip():
-        q = q.filter(Project.project_name.ilike(f"%{project_name.strip()}%"))
-    if region_code is not None and region_code.strip():
-        q = q.filter(Project.region_code.ilike(f"%{region_code.strip()}%"))
-    if province_code is not None and province_code.strip():
-        q = q.filter(Project.province_code.ilike(f"%{province_code.strip()}%"))
-    if lot_type is not None and lot_type.strip():
-        q = q.filter(Project.lot_type == lot_type.strip())
-    if project_prog_id is not None:
-        q = q.filter(Project.project_prog_id == project_prog_id)
-    if approval_status is not None and approval_status.strip():
-        q = q.filter(Project.approval_status == approval_status.strip())
-    items = q.offset(skip).limit(limit).all()
-    return items
+    def query(db: Session):
+        q = unfiltered = _not_deleted(db.query(Project))
+        # Codes match by prefix (btree pattern indexes); the name by substring (pg_trgm GIN index, migration 019)
+        if project_code is not None and project_code.strip():
+            prefix = f"{escape_like(project_code.strip().lower())}%"
+            q = q.filter(func.lower(Project.project_code).like(prefix, escape="\\"))
+        if project_name is not None and project_name.strip():
+            q = q.filter(Project.project_name.ilike(f"%{escape_like(project_name.strip())}%", escape="\\"))
+        if region_code is not None and region_code.strip():
+            q = q.filter(Project.region_code.like(_psgc_prefix(region_code), escape="\\"))
+        if province_code is not None and province_code.strip():
+            q = q.filter(Project.province_code.like(_psgc_prefix(province_code), escape="\\"))
+        if lot_type is not None and lot_type.strip():
+            q = q.filter(Project.lot_type == lot_type.strip())
+        if project_prog_id is not None:
+            q = q.filter(Project.project_prog_id == project_prog_id)
+        if approval_status is not None and approval_status.strip():
+            q = q.filter(Project.approval_status == approval_status.strip())
+        items = paginate(q, (Project.project_code,), response, cursor, limit, skip)
+        if include_total:
+            set_total_count(q, response, filtered=q is not unfiltered)
+        return items
+
+    return await db.run(query)
 
 
 @router.get("/{project_code}", response_model=ProjectResponse)
@@ -62,6 +84,7 @@ def create_project(payload: ProjectCreate, db: Session = Depends(get_db)):
     item = Project(**data)
     db.add(item)
     db.commit()
+    invalidate_search("projects")
     db.refresh(item)
     return item
 
@@ -78,6 +101,7 @@ def update_project(
     for key, value in payload.model_dump(exclude_unset=True).items():
         setattr(item, key, value)
     db.commit()
+    invalidate_search("projects")
     db.refresh(item)
     return item
 
@@ -99,6 +123,7 @@ def patch_project(
         if "approved_by" in data:
             item.approved_by = data["approved_by"]
     db.commit()
+    invalidate_search("projects")
     db.refresh(item)
     return item
 
@@ -110,4 +135,5 @@ def delete_project(project_code: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Project not found")
     item.deleted_at = datetime.now(timezone.utc)
     db.commit()
+    invalidate_search("projects")
     return None
@@ -1,21 +1,71 @@
-from fastapi import APIRouter, Depends, HTTPException
+import csv
+import io
+import json
+from itertools import chain
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.api.export import export_response
+from app.api.pagination import paginate, set_total_count
+from app.database import AsyncDB, get_async_db, get_db
 from app.models.property import Property
 from app.schemas.property import PropertyCreate, PropertyResponse, PropertyUpdate
+from app.services.property_import import iter_property_import
 
 router = APIRouter()
 
 
 @router.get("/", response_model=list[PropertyResponse])
-def list_properties(
+async def list_properties(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncDB = Depends(get_async_db),
 ):
-    items = db.query(Property).offset(skip).limit(limit).all()
-    return items
+    def query(db: Session):
+        q = db.query(Property)
+        items = paginate(q, (Property.geoid,), response, cursor, limit, skip)
+        if include_total:
+            set_total_count(q, response, filtered=False)
+        return items
+
+    return await db.run(query)
+
+
+@router.get("/export")
+def export_properties(request: Request, format: str = "csv"):
+    """Stream all properties as CSV or XLSX (server-side cursor, constant memory)."""
+    return export_response(request, Property, PropertyResponse, (Property.geoid,), format, "properties")
+
+
+@router.post("/import")
+def import_properties(file: UploadFile = File(...), chunk_rows: int = 5000, db: Session = Depends(get_db)):
+    """
+    Import/update lots from a subdivision CSV (header row, geoid required; other columns as in PropertyCreate).
+    Streams newline-delimited JSON: a start event, progress events with running counts and rejected lines, and
+    a final done event with inserted/updated/unchanged counts (or an error event if a later line could not be
+    parsed or the merge failed; nothing is written then).
+    """
+    events = iter_property_import(db, io.TextIOWrapper(file.file, encoding="utf-8-sig", newline=""), chunk_rows)
+    try:
+        first = next(events)
+    except (ValueError, UnicodeDecodeError, csv.Error) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    def ndjson():
+        try:
+            for event in chain([first], events):
+                yield json.dumps(event) + "\n"
+        except (SQLAlchemyError, UnicodeDecodeError, csv.Error) as exc:
+            yield json.dumps({"event": "error", "detail": str(exc).strip().splitlines()[0]}) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
 
 
 @router.get("/{geoid}", response_model=PropertyResponse)
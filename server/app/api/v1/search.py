@@ -1,28 +1,49 @@
 from typing import Optional
+from uuid import UUID
 
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
-
-from app.database import get_db
-from app.models.application import Application
-from app.models.beneficiary import Beneficiary
-from app.models.program import Program
-from app.models.project import Project
-from app.schemas.application import ApplicationResponse
-from app.schemas.beneficiary import BeneficiaryResponse
-from app.schemas.program import ProgramResponse
-from app.schemas.project import ProjectResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.database import AsyncDB, get_async_db
+from app.services.search_cache import get_cached, normalize_phrase, search_cache_stats, set_cached
+from app.services.search_service import ENTITY_TYPES, search_entities
 from pydantic import BaseModel
 
 router = APIRouter()
 
+
+# Hits carry only the fields the search dropdown renders
+class ProjectSearchHit(BaseModel):
+    project_code: str
+    project_name: Optional[str] = None
+
+
+class ProgramSearchHit(BaseModel):
+    project_prog_id: int
+    mc_ref: Optional[str] = None
+
+
+class ApplicationSearchHit(BaseModel):
+    app_id: UUID
+    prequalification_no: Optional[str] = None
+    last_name: Optional[str] = None
+    first_name: Optional[str] = None
+
+
+class BeneficiarySearchHit(BaseModel):
+    id: int
+    bin: Optional[str] = None
+    last_name: Optional[str] = None
+    first_name: Optional[str] = None
+    common_code: Optional[str] = None
+
+
 # Response shape for OpenAPI
 class SearchResponse(BaseModel):
-    projects: list[ProjectResponse]
-    programs: list[ProgramResponse]
-    applications: list[ApplicationResponse]
-    beneficiaries: list[BeneficiaryResponse]
+    projects: list[ProjectSearchHit]
+    programs: list[ProgramSearchHit]
+    applications: list[ApplicationSearchHit]
+    beneficiaries: list[BeneficiarySearchHit]
 
 
 def _limit_cap(limit: int, cap: int = 20) -> int:
@@ -30,12 +51,12 @@ def _limit_cap(limit: int, cap: int = 20) -> int:
 
 
 @router.get("/", response_model=SearchResponse)
-def search(
+async def search(
     q: Optional[str] = None,
     limit: int = 5,
-    db: Session = Depends(get_db),
+    db: AsyncDB = Depends(get_async_db),
 ):
-    phrase = (q or "").strip()
+    phrase = normalize_phrase(q or "")
     limit_per_type = _limit_cap(limit)
 
     if len(phrase) < 2:
@@ -46,65 +67,17 @@ def search(
             beneficiaries=[],
         )
 
-    pattern = f"%{phrase}%"
-
-    # Projects: non-deleted, match project_code or project_name
-    projects_q = (
-        db.query(Project)
-        .filter(Project.deleted_at.is_(None))
-        .filter(
-            or_(
-                Project.project_code.ilike(pattern),
-                Project.project_name.ilike(pattern),
-            )
-        )
-        .limit(limit_per_type)
-        .all()
-    )
-
-    # Programs: non-deleted, match mc_ref
-    programs_q = (
-        db.query(Program)
-        .filter(Program.deleted_at.is_(None))
-        .filter(Program.mc_ref.ilike(pattern))
-        .limit(limit_per_type)
-        .all()
-    )
-
-    # Applications: non-deleted, match prequalification_no, last_name, first_name
-    applications_q = (
-        db.query(Application)
-        .filter(Application.deleted_at.is_(None))
-        .filter(
-            or_(
-                Application.prequalification_no.ilike(pattern),
-                Application.last_name.ilike(pattern),
-                Application.first_name.ilike(pattern),
-            )
-        )
-        .limit(limit_per_type)
-        .all()
-    )
-
-    # Beneficiaries: non-deleted, match last_name, first_name, bin, common_code
-    beneficiaries_q = (
-        db.query(Beneficiary)
-        .filter(Beneficiary.deleted_at.is_(None))
-        .filter(
-            or_(
-                Beneficiary.last_name.ilike(pattern),
-                Beneficiary.first_name.ilike(pattern),
-                Beneficiary.bin.ilike(pattern),
-                Beneficiary.common_code.ilike(pattern),
-            )
-        )
-        .limit(limit_per_type)
-        .all()
-    )
-
-    return SearchResponse(
-        projects=projects_q,
-        programs=programs_q,
-        applications=applications_q,
-        beneficiaries=beneficiaries_q,
-    )
+    # The cache client is synchronous (Redis), so it stays off the event loop. A client that just wrote skips
+    # cached hits, which may have been filled from a lagging replica, and refreshes them from the primary.
+    results, pending = await run_in_threadpool(get_cached, ENTITY_TYPES, phrase, limit_per_type, db.fresh)
+    if pending:
+        fresh = await db.run(search_entities, phrase, limit_per_type, tuple(pending))
+        await run_in_threadpool(set_cached, pending, fresh)
+        results.update(fresh)
+    return SearchResponse(**results)
+
+
+@router.get("/cache/stats")
+def cache_stats() -> dict:
+    """Search result cache hit/miss/invalidation counters per entity type."""
+    return search_cache_stats()
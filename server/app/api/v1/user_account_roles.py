@@ -1,10 +1,11 @@
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.api.pagination import paginate, set_total_count
+from app.database import AsyncDB, get_async_db, get_db
 from app.models.user_account import UserAccount
 from app.models.user_account_role import UserAccountRole
 from app.models.user_role import UserRole
@@ -14,20 +15,28 @@ router = APIRouter()
 
 
 @router.get("/", response_model=list[UserAccountRoleResponse])
-def list_user_account_roles(
+async def list_user_account_roles(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     user_account_id: Optional[UUID] = Query(None, description="Filter by user account"),
     role_id: Optional[int] = Query(None, description="Filter by role"),
-    db: Session = Depends(get_db),
+    db: AsyncDB = Depends(get_async_db),
 ):
-    q = db.query(UserAccountRole)
-    if user_account_id is not None:
-        q = q.filter(UserAccountRole.user_account_id == user_account_id)
-    if role_id is not None:
-        q = q.filter(UserAccountRole.role_id == role_id)
-    items = q.offset(skip).limit(limit).all()
-    return items
+    def query(db: Session):
+        q = unfiltered = db.query(UserAccountRole)
+        if user_account_id is not None:
+            q = q.filter(UserAccountRole.user_account_id == user_account_id)
+        if role_id is not None:
+            q = q.filter(UserAccountRole.role_id == role_id)
+        items = paginate(q, (UserAccountRole.user_account_id, UserAccountRole.role_id), response, cursor, limit, skip)
+        if include_total:
+            set_total_count(q, response, filtered=q is not unfiltered)
+        return items
+
+    return await db.run(query)
 
 
 @router.get("/{user_account_id}/{role_id}", response_model=UserAccountRoleResponse)
@@ -1,9 +1,11 @@
+from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.api.pagination import paginate, set_total_count
+from app.database import AsyncDB, get_async_db, get_db
 from app.models.user_account import UserAccount
 from app.schemas.user_account import UserAccountCreate, UserAccountResponse, UserAccountUpdate
 
@@ -11,17 +13,25 @@ router = APIRouter()
 
 
 @router.get("/", response_model=list[UserAccountResponse])
-def list_user_accounts(
+async def list_user_accounts(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     is_active: bool | None = None,
-    db: Session = Depends(get_db),
+    db: AsyncDB = Depends(get_async_db),
 ):
-    q = db.query(UserAccount)
-    if is_active is not None:
-        q = q.filter(UserAccount.is_active == is_active)
-    items = q.offset(skip).limit(limit).all()
-    return items
+    def query(db: Session):
+        q = unfiltered = db.query(UserAccount)
+        if is_active is not None:
+            q = q.filter(UserAccount.is_active == is_active)
+        items = paginate(q, (UserAccount.id,), response, cursor, limit, skip)
+        if include_total:
+            set_total_count(q, response, filtered=q is not unfiltered)
+        return items
+
+    return await db.run(query)
 
 
 @router.get("/{account_id}", response_model=UserAccountResponse)
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.api.pagination import paginate, set_total_count
+from app.database import AsyncDB, get_async_db, get_db
 from app.models.user_role import UserRole
 from app.schemas.user_role import UserRoleCreate, UserRoleResponse, UserRoleUpdate
 
@@ -9,13 +12,22 @@ router = APIRouter()
 
 
 @router.get("/", response_model=list[UserRoleResponse])
-def list_user_roles(
+async def list_user_roles(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncDB = Depends(get_async_db),
 ):
-    items = db.query(UserRole).offset(skip).limit(limit).all()
-    return items
+    def query(db: Session):
+        q = db.query(UserRole)
+        items = paginate(q, (UserRole.id,), response, cursor, limit, skip)
+        if include_total:
+            set_total_count(q, response, filtered=False)
+        return items
+
+    return await db.run(query)
 
 
 @router.get("/{role_id}", response_model=UserRoleResponse)
@@ -1,19 +1,272 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+import threading
+import time
+from typing import Any
+
+from fastapi import Request
+from sqlalchemy import create_engine, event, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
 
 from app.config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-)
+# Upper bounds (ms) of the checkout wait histogram in pool_stats()
+_WAIT_BUCKETS_MS = (1, 10, 100, 1000)
+
+# Cookie holding the epoch second until which the client's reads go to the primary (read-your-writes)
+PRIMARY_READS_COOKIE = "lis_primary_until"
+_SAFE_METHODS = ("GET", "HEAD")
+
+_stats_lock = threading.Lock()
+_pool_stats: dict[str, dict[str, Any]] = {}
+# label -> sync Engine (async engines by their sync_engine) whose pool is reported by pool_stats()
+_engines: dict[str, Any] = {}
+
+
+def _record_checkout_wait(pool, started: float, timed_out: bool = False) -> None:
+    waited = (time.perf_counter() - started) * 1000
+    with _stats_lock:
+        stats = _pool_stats.get(getattr(pool, "_stats_label", ""))
+        if stats is None:
+            return
+        stats["timeouts" if timed_out else "checkouts"] += 1
+        stats["wait_ms_total"] += waited
+        stats["wait_ms_max"] = max(stats["wait_ms_max"], waited)
+        bucket = next((f"le_{b}" for b in _WAIT_BUCKETS_MS if waited <= b), f"gt_{_WAIT_BUCKETS_MS[-1]}")
+        stats["wait_buckets"][bucket] += 1
+
+
+class _TimedCheckout:
+    """Pool mixin timing connect(): queueing for a free connection, plus pre-ping or opening a new one."""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            _record_checkout_wait(self, started, timed_out=True)
+            raise
+        _record_checkout_wait(self, started)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a new pool; event listeners carry over, the stats label must too
+        pool = super().recreate()
+        pool._stats_label = self._stats_label
+        return pool
+
+
+class _TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class _TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def _engine_options(is_async: bool, read_only: bool = False) -> dict[str, Any]:
+    options: dict[str, Any] = {
+        "poolclass": _TimedAsyncQueuePool if is_async else _TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    # Set at connection startup, so they cost no extra round trip and survive rollbacks
+    server_settings = {}
+    if settings.DB_STATEMENT_TIMEOUT > 0:
+        server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT)
+    if read_only:
+        server_settings["default_transaction_read_only"] = "on"
+    if server_settings:
+        if is_async:
+            options["connect_args"] = {"server_settings": server_settings}
+        else:
+            options["connect_args"] = {"options": " ".join(f"-c {k}={v}" for k, v in server_settings.items())}
+    return options
+
+
+def _instrument_pool(engine, label: str) -> None:
+    """Count new connections, invalidations, peak usage and checkouts made in overflow via engine's pool events."""
+    engine.pool._stats_label = label
+    _engines[label] = engine
+    with _stats_lock:
+        _pool_stats[label] = {
+            "checkouts": 0,
+            "timeouts": 0,
+            "connects": 0,
+            "overflow_checkouts": 0,
+            "invalidations": 0,
+            "peak_checked_out": 0,
+            "peak_overflow": 0,
+            "wait_ms_total": 0.0,
+            "wait_ms_max": 0.0,
+            "wait_buckets": {**{f"le_{b}": 0 for b in _WAIT_BUCKETS_MS}, f"gt_{_WAIT_BUCKETS_MS[-1]}": 0},
+        }
+    stats = _pool_stats[label]
+
+    @event.listens_for(engine.pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        with _stats_lock:
+            stats["connects"] += 1
+
+    @event.listens_for(engine.pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool = engine.pool
+        checked_out, overflow = pool.checkedout(), pool.overflow()
+        with _stats_lock:
+            stats["peak_checked_out"] = max(stats["peak_checked_out"], checked_out)
+            stats["peak_overflow"] = max(stats["peak_overflow"], overflow)
+            # More connections in use than pool_size: this request needed an overflow connection
+            if checked_out > pool.size():
+                stats["overflow_checkouts"] += 1
+
+    @event.listens_for(engine.pool, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        with _stats_lock:
+            stats["invalidations"] += 1
+
+
+def _async_url(url: str):
+    return make_url(url).set(drivername="postgresql+asyncpg")
+
+
+engine = create_engine(settings.DATABASE_URL, **_engine_options(is_async=False))
+_instrument_pool(engine, "sync")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Optional read replica (DATABASE_REPLICA_URL); its sessions are read-only at the Postgres level
+replica_engine = None
+ReplicaSessionLocal = None
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_engine(settings.DATABASE_REPLICA_URL, **_engine_options(is_async=False, read_only=True))
+    _instrument_pool(replica_engine, "replica")
+    ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
+# Optional asyncpg engines for the read routes (DATABASE_ASYNC); asyncpg and greenlet are only imported when on
+async_engine = None
+AsyncSessionLocal = None
+async_replica_engine = None
+AsyncReplicaSessionLocal = None
+if settings.DATABASE_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        settings.DATABASE_ASYNC_URL or _async_url(settings.DATABASE_URL),
+        **_engine_options(is_async=True),
+    )
+    _instrument_pool(async_engine.sync_engine, "async")
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    if settings.DATABASE_REPLICA_URL:
+        async_replica_engine = create_async_engine(
+            _async_url(settings.DATABASE_REPLICA_URL),
+            **_engine_options(is_async=True, read_only=True),
+        )
+        _instrument_pool(async_replica_engine.sync_engine, "replica_async")
+        AsyncReplicaSessionLocal = async_sessionmaker(async_replica_engine, autoflush=False, expire_on_commit=False)
 
-def get_db():
+
+def recently_wrote(request: Request) -> bool:
+    """True while the client is inside its read-your-writes window (see PRIMARY_READS_COOKIE)."""
+    try:
+        return float(request.cookies.get(PRIMARY_READS_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def writes_nothing(request: Request) -> None:
+    """Route dependency for a non-GET route that changes no data, so it does not start a read-your-writes window."""
+    request.state.writes_nothing = True
+
+
+def reads_from_replica(request: Request) -> bool:
+    """GET/HEAD requests go to the replica, unless none is configured or the client wrote moments ago."""
+    return replica_engine is not None and request.method in _SAFE_METHODS and not recently_wrote(request)
+
+
+def pool_stats() -> dict[str, Any]:
+    """
+    Connection pool usage of this worker process, per engine: configured limits, current checked-out/idle/overflow
+    connections, peaks, checkout wait (total, max, histogram), timeouts, new connections and overflow checkouts.
+    """
+    result: dict[str, Any] = {}
+    for label, pool_engine in _engines.items():
+        pool = pool_engine.pool
+        with _stats_lock:
+            stats: dict[str, Any] = {**_pool_stats[label], "wait_buckets": dict(_pool_stats[label]["wait_buckets"])}
+        waits = stats["checkouts"] + stats["timeouts"]
+        stats["wait_ms_mean"] = round(stats["wait_ms_total"] / waits, 3) if waits else None
+        stats["wait_ms_total"] = round(stats["wait_ms_total"], 1)
+        stats["wait_ms_max"] = round(stats["wait_ms_max"], 1)
+        result[label] = {
+            "pool_size": pool.size(),
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            **stats,
+        }
+    return result
+
+
+def session_for(request: Request) -> Session:
+    """
+    A new session on the replica or the primary, as get_db would pick for request. For response bodies that read
+    after the endpoint returns: the caller owns it and must close it.
+    """
+    return (ReplicaSessionLocal if reads_from_replica(request) else SessionLocal)()
+
+
+def get_db(request: Request):
+    db = session_for(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_primary_db():
+    """
+    get_db without replica routing, for reads that fill caches outliving the request: a lagging replica could
+    refill them, right after an invalidation, with rows the primary has already changed.
+    """
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+class AsyncDB:
+    """
+    Session handle for async read routes. run(fn, *args) calls fn(session, *args) with an ordinary Session, so
+    query code is shared with the sync routes: on the asyncpg engine (AsyncSession.run_sync) no thread is held
+    while Postgres works; without DATABASE_ASYNC it runs on a SessionLocal session in the threadpool.
+    fresh is set when the client wrote moments ago, so results cached from a lagging replica should be bypassed.
+    """
+
+    def __init__(self, session, fresh: bool = False):
+        self.session = session
+        self.fresh = fresh
+
+    async def run(self, fn, *args):
+        if AsyncSessionLocal is not None:
+            return await self.session.run_sync(fn, *args)
+        return await run_in_threadpool(fn, self.session, *args)
+
+
+async def get_async_db(request: Request):
+    replica = reads_from_replica(request)
+    fresh = replica_engine is not None and not replica
+    if AsyncSessionLocal is not None:
+        async with (AsyncReplicaSessionLocal if replica else AsyncSessionLocal)() as session:
+            yield AsyncDB(session, fresh)
+        return
+    db = (ReplicaSessionLocal if replica else SessionLocal)()
+    try:
+        yield AsyncDB(db, fresh)
+    finally:
+        await run_in_threadpool(db.close)
@@ -1,12 +1,35 @@
-from fastapi import FastAPI
+import os
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, TOTAL_EXACT_HEADER
 from app.api.v1 import api_router
+from app.config import settings
+from app.database import PRIMARY_READS_COOKIE, async_engine, async_replica_engine, pool_stats, replica_engine
+from app.redis_client import start_address_invalidation_listener, stop_address_invalidation_listener
+from app.services.address_index import get_address_index
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the address CSV index before serving so no request pays for the first load
+    get_address_index()
+    start_address_invalidation_listener()
+    yield
+    stop_address_invalidation_listener()
+    for engine in (async_engine, async_replica_engine):
+        if engine is not None:
+            await engine.dispose()
+
 
 app = FastAPI(
     title="LIS API",
     description="Lot Information System API",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -15,8 +38,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, TOTAL_EXACT_HEADER],
 )
 
+
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    """After a successful write, keep the client's GETs on the primary until the replica has caught up."""
+    response = await call_next(request)
+    wrote = request.method not in ("GET", "HEAD", "OPTIONS") and not getattr(request.state, "writes_nothing", False)
+    if replica_engine is not None and wrote and response.status_code < 400:
+        window = settings.DATABASE_REPLICA_STICKY_SECONDS
+        response.set_cookie(
+            PRIMARY_READS_COOKIE, str(int(time.time()) + window), max_age=window, httponly=True, samesite="lax"
+        )
+    return response
+
+
 app.include_router(api_router, prefix="/api/v1")
 
 
@@ -28,3 +66,9 @@ def root():
 @app.get("/health")
 def health():
     return {"status": "ok"}
+
+
+@app.get("/health/db-pool")
+def db_pool_health():
+    """Connection pool usage of the worker that answers (each uvicorn worker has its own pools)."""
+    return {"pid": os.getpid(), "pools": pool_stats()}
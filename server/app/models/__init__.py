@@ -12,6 +12,7 @@ from app.models.program import Program
 from app.models.program_classification import ProgramClassification
 from app.models.project import Project
 from app.models.property import Property
+from app.models.search_index import SearchIndex
 from app.models.user_account import UserAccount
 from app.models.user_account_role import UserAccountRole
 from app.models.user_log import UserLog
@@ -30,6 +31,7 @@ __all__ = [
     "ProgramClassification",
     "Project",
     "Property",
+    "SearchIndex",
     "UserAccount",
     "UserAccountRole",
     "UserLog",
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, Date, DateTime, String, Text
+from sqlalchemy import Column, Computed, Date, DateTime, String, Text
 from sqlalchemy.dialects.postgresql import UUID
 
 from app.database import Base
@@ -33,3 +33,14 @@ class Application(Base):
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
     deleted_at = Column(DateTime(timezone=True), nullable=True)
+    # Generated by Postgres from the name columns (migration 021); used for duplicate detection
+    last_name_key = Column(Text, Computed("replace(person_name_key(last_name), ' ', '')", persisted=True))
+    first_name_key = Column(Text, Computed("person_name_key(first_name)", persisted=True))
+    name_phonetic = Column(
+        Text,
+        Computed(
+            "name_phonetic(replace(person_name_key(last_name), ' ', '')) || ':' "
+            "|| coalesce(name_phonetic(split_part(person_name_key(first_name), ' ', 1)), '')",
+            persisted=True,
+        ),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Date, DateTime, Integer, String, Text
+from sqlalchemy import Column, Computed, Date, DateTime, Integer, String, Text
 
 from app.database import Base
 
@@ -30,3 +30,14 @@ class Beneficiary(Base):
     ssp = Column(String(1), nullable=True)
     category = Column(String(10), nullable=True)
     deleted_at = Column(DateTime(timezone=True), nullable=True)
+    # Generated by Postgres from the name columns (migration 021); used for duplicate detection
+    last_name_key = Column(Text, Computed("replace(person_name_key(last_name), ' ', '')", persisted=True))
+    first_name_key = Column(Text, Computed("person_name_key(first_name)", persisted=True))
+    name_phonetic = Column(
+        Text,
+        Computed(
+            "name_phonetic(replace(person_name_key(last_name), ' ', '')) || ':' "
+            "|| coalesce(name_phonetic(split_part(person_name_key(first_name), ' ', 1)), '')",
+            persisted=True,
+        ),
+    )
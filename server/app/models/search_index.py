@@ -0,0 +1,19 @@
+from sqlalchemy import Boolean, Column, DateTime, String, Text, text
+
+from app.database import Base
+
+
+class SearchIndex(Base):
+    """Denormalized global search rows; maintained by database triggers (migration 020), read-only here."""
+
+    __tablename__ = "search_index"
+
+    entity_type = Column(String(20), primary_key=True)
+    entity_key = Column(String(64), primary_key=True)
+    code = Column(Text, nullable=True)
+    title = Column(Text, nullable=True)
+    subtitle = Column(Text, nullable=True)
+    extra = Column(Text, nullable=True)
+    search_text = Column(Text, nullable=False, server_default="")
+    deleted = Column(Boolean, nullable=False, server_default=text("false"))
+    updated_at = Column(DateTime(timezone=True), server_default=text("now()"), nullable=True)
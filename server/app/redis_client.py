@@ -1,76 +1,493 @@
-"""Redis client for address cache. If REDIS_URL is not set, get_redis() returns None and callers skip cache."""
+"""
+Redis client for address cache. If REDIS_URL is not set, get_redis() returns None and callers skip cache.
+Connections come from a bounded pool with short timeouts; on connection failure a circuit breaker makes
+get_redis() return None until a background probe finds Redis healthy again.
 
+Address lists are cached in two tiers: a bounded per-process LRU (L1) in front of Redis (L2).
+Deletes evict L1 locally and are broadcast on a pub/sub channel so other workers evict too.
+Redis keys carry a per-level generation so a whole level can be dropped by bumping a counter.
+Derived structures (tree payloads, code and search indexes) are held per process outside the LRU, until the
+"derived" level is invalidated.
+"""
+
+import fnmatch
 import json
+import logging
+import threading
+import time
+import zlib
+from collections import OrderedDict
 from typing import Any
 
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 _redis_client: Any = None
 
+ADDRESS_INVALIDATE_CHANNEL = "address:invalidate"
+
+
+class LocalCache:
+    """Thread-safe LRU with per-entry TTL. Values are shared, callers must not mutate them."""
+
+    def __init__(self, maxsize: int, ttl_seconds: int):
+        self._maxsize = maxsize
+        self._ttl = ttl_seconds
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        if self._maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self._ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_pattern(self, pattern: str) -> None:
+        with self._lock:
+            for key in [k for k in self._data if fnmatch.fnmatchcase(k, pattern)]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_local_cache = LocalCache(settings.ADDRESS_L1_MAXSIZE, settings.ADDRESS_L1_TTL)
+
+# Derived address structures: a handful of large values that take whole-table loads to rebuild, so neither the
+# LRU's size limit nor its TTL applies. They are dropped when the "derived" generation changes (here or, via
+# pub/sub, on another worker); without Redis there is no cross-worker signal, so ADDRESS_L1_TTL bounds them.
+_derived: dict[str, tuple[float, Any]] = {}
+_derived_version = 0
+_derived_lock = threading.Lock()
+
+
+_redis_pool: Any = None
+
+# Circuit breaker: after a connection failure get_redis() returns None (no connect attempts from request
+# threads) until a background probe pings Redis successfully again.
+_circuit_open = False
+_circuit_lock = threading.Lock()
+_probe_thread: threading.Thread | None = None
+
+_stats_lock = threading.Lock()
+_stats: dict[str, int] = {
+    "l1_hits": 0,
+    "hits": 0,
+    "misses": 0,
+    "errors": 0,
+    "circuit_trips": 0,
+}
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def _redis_configured() -> bool:
+    return settings.REDIS_URL is not None and bool(str(settings.REDIS_URL).strip())
+
+
+def _get_pool():
+    global _redis_pool
+    if _redis_pool is None:
+        import redis
+        _redis_pool = redis.ConnectionPool.from_url(
+            settings.REDIS_URL,
+            decode_responses=False,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+            health_check_interval=30,
+        )
+    return _redis_pool
+
+
+def _probe_until_healthy() -> None:
+    global _circuit_open, _redis_client, _probe_thread
+    while True:
+        time.sleep(settings.REDIS_RETRY_BACKOFF)
+        try:
+            import redis
+            client = redis.Redis(connection_pool=_get_pool())
+            client.ping()
+        except Exception:
+            continue
+        with _circuit_lock:
+            _redis_client = client
+            _circuit_open = False
+            _probe_thread = None
+        logger.info("Redis reachable again; address cache re-enabled")
+        return
+
+
+def _trip_circuit() -> None:
+    """Stop using Redis and start the background re-probe (once)."""
+    global _circuit_open, _redis_client, _probe_thread
+    with _circuit_lock:
+        if _circuit_open:
+            return
+        _circuit_open = True
+        _redis_client = None
+        _count("circuit_trips")
+        logger.warning("Redis unavailable; address cache bypassed for %ss between probes", settings.REDIS_RETRY_BACKOFF)
+        _probe_thread = threading.Thread(target=_probe_until_healthy, name="redis-probe", daemon=True)
+        _probe_thread.start()
+
+
+def _record_error(exc: Exception) -> None:
+    _count("errors")
+    try:
+        import redis
+        if isinstance(exc, (redis.ConnectionError, redis.TimeoutError)):
+            _trip_circuit()
+    except ImportError:
+        pass
+
 
 def get_redis():
-    """Return a Redis client or None if REDIS_URL is not configured or Redis is unavailable."""
+    """Return a pooled Redis client, or None if REDIS_URL is not configured or the circuit is open."""
     global _redis_client
-    if settings.REDIS_URL is None or not str(settings.REDIS_URL).strip():
+    if not _redis_configured() or _circuit_open:
         return None
     if _redis_client is None:
         try:
             import redis
-            _redis_client = redis.from_url(
-                settings.REDIS_URL,
-                decode_responses=True,
-            )
-            _redis_client.ping()
+            client = redis.Redis(connection_pool=_get_pool())
+            client.ping()
+            _redis_client = client
         except Exception:
-            _redis_client = None
+            _count("errors")
+            _trip_circuit()
+            return None
     return _redis_client
 
 
+def address_cache_stats() -> dict[str, Any]:
+    """Hit/miss/error counters for the address cache plus current Redis state."""
+    with _stats_lock:
+        stats: dict[str, Any] = dict(_stats)
+    lookups = stats["l1_hits"] + stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round((stats["l1_hits"] + stats["hits"]) / lookups, 4) if lookups else None
+    stats["redis_configured"] = _redis_configured()
+    stats["circuit_open"] = _circuit_open
+    return stats
+
+
+def _publish_invalidation(r: Any, message: str) -> None:
+    try:
+        r.publish(ADDRESS_INVALIDATE_CHANNEL, message)
+    except Exception as e:
+        _record_error(e)
+
+
+# Cached address lists are stored as parallel code/name columns instead of JSON objects:
+#   b"\x01" + codes joined by \x1f + b"\x1e" + names joined by \x1f     (plain)
+#   b"\x02" + zlib(the same payload)                                      (lists over the threshold)
+# Values starting with "[" are legacy JSON and still decode, so old and new workers can share Redis during
+# rollout. Unknown tags decode to None and are treated as a miss.
+_CODEC_PLAIN = b"\x01"
+_CODEC_ZLIB = b"\x02"
+_CODEC_COMPRESS_THRESHOLD = 1024
+_FIELD_SEP = "\x1f"
+_COLUMN_SEP = "\x1e"
+
+
+def _encode_address_list(value: list[dict[str, str]]) -> bytes:
+    codes = [item["code"] for item in value]
+    names = [item["name"] for item in value]
+    if any(_FIELD_SEP in f or _COLUMN_SEP in f for f in codes + names):
+        return json.dumps(value).encode("utf-8")
+    payload = (_FIELD_SEP.join(codes) + _COLUMN_SEP + _FIELD_SEP.join(names)).encode("utf-8") if value else b""
+    if len(payload) > _CODEC_COMPRESS_THRESHOLD:
+        return _CODEC_ZLIB + zlib.compress(payload, 6)
+    return _CODEC_PLAIN + payload
+
+
+def _decode_address_list(raw: bytes | str) -> list[dict[str, str]] | None:
+    if isinstance(raw, str):
+        raw = raw.encode("utf-8")
+    tag, payload = raw[:1], raw[1:]
+    if tag == b"[":
+        return json.loads(raw)
+    if tag == _CODEC_ZLIB:
+        payload = zlib.decompress(payload)
+    elif tag != _CODEC_PLAIN:
+        return None
+    if not payload:
+        return []
+    codes, _, names = payload.decode("utf-8").partition(_COLUMN_SEP)
+    return [{"code": c, "name": n} for c, n in zip(codes.split(_FIELD_SEP), names.split(_FIELD_SEP))]
+
+
+# Redis keys are namespaced by a per-level generation: logical "address:provinces:PH01" is stored as
+# "address:v{n}:provinces:PH01" where n is the counter at "address:gen:provinces". Bumping the counter
+# invalidates a whole level in O(1); orphaned keys from older generations expire via their TTL.
+_generations: dict[str, int] = {}
+
+
+def _level_of(key: str) -> str:
+    parts = key.split(":", 2)
+    return parts[1] if len(parts) > 1 else ""
+
+
+def _generation(r: Any, level: str) -> int:
+    gen = _generations.get(level)
+    if gen is None:
+        raw = r.get(f"address:gen:{level}")
+        gen = int(raw) if raw else 0
+        _generations[level] = gen
+    return gen
+
+
+def _physical_key(r: Any, key: str) -> str:
+    """Map a logical address key to its generation-namespaced Redis key."""
+    return f"address:v{_generation(r, _level_of(key))}:{key.split(':', 1)[1]}"
+
+
 def address_cache_get(key: str) -> list[dict[str, str]] | None:
-    """Get a cached JSON array for an address key. Returns None on miss or if Redis unavailable."""
+    """Get a cached address list: in-process L1 first, then Redis. Returns None on miss."""
+    value = _local_cache.get(key)
+    if value is not None:
+        _count("l1_hits")
+        return value
     r = get_redis()
     if r is None:
+        _count("misses")
         return None
     try:
-        raw = r.get(key)
+        raw = r.get(_physical_key(r, key))
         if raw is None:
+            _count("misses")
             return None
-        return json.loads(raw)
-    except Exception:
+        value = _decode_address_list(raw)
+        if value is None:
+            _count("misses")
+            return None
+    except Exception as e:
+        _record_error(e)
+        return None
+    _count("hits")
+    _local_cache.set(key, value)
+    return value
+
+
+def address_derived_get(key: str) -> Any | None:
+    """Get a derived structure held by this process, or None."""
+    with _derived_lock:
+        entry = _derived.get(key)
+    if entry is None or entry[0] < time.monotonic():
         return None
+    return entry[1]
+
+
+def address_derived_version() -> int:
+    """Counter bumped whenever derived structures are dropped; read it before building one."""
+    return _derived_version
+
+
+def address_derived_set(key: str, value: Any, version: int) -> None:
+    """Hold a derived structure built at version, unless derived data was invalidated while it was being built."""
+    ttl = float("inf") if _redis_configured() else settings.ADDRESS_L1_TTL
+    with _derived_lock:
+        if version == _derived_version:
+            _derived[key] = (time.monotonic() + ttl, value)
+
+
+def _drop_derived() -> None:
+    global _derived_version
+    with _derived_lock:
+        _derived.clear()
+        _derived_version += 1
 
 
 def address_cache_set(key: str, value: list[dict[str, str]], ttl_seconds: int = 86400 * 7) -> None:
-    """Set an address list in Redis. ttl_seconds default 7 days; use 0 for no expiry."""
+    """Set an address list in L1 and Redis. ttl_seconds (Redis only) default 7 days; use 0 for no expiry."""
+    _local_cache.set(key, value)
     r = get_redis()
     if r is None:
         return
     try:
-        r.set(key, json.dumps(value), ex=ttl_seconds if ttl_seconds else None)
-    except Exception:
-        pass
+        r.set(_physical_key(r, key), _encode_address_list(value), ex=ttl_seconds if ttl_seconds else None)
+    except Exception as e:
+        _record_error(e)
+
+
+def address_cache_set_many(
+    items: dict[str, list[dict[str, str]]],
+    ttl_seconds: int = 86400 * 7,
+    batch_size: int = 500,
+) -> int:
+    """Set many address lists in L1 and Redis using pipelined batches. Returns keys written to Redis."""
+    for key, value in items.items():
+        _local_cache.set(key, value)
+    r = get_redis()
+    if r is None:
+        return 0
+    written = 0
+    keys = list(items)
+    try:
+        for start in range(0, len(keys), batch_size):
+            chunk = keys[start:start + batch_size]
+            pipe = r.pipeline(transaction=False)
+            for key in chunk:
+                pipe.set(_physical_key(r, key), _encode_address_list(items[key]), ex=ttl_seconds if ttl_seconds else None)
+            pipe.execute()
+            written += len(chunk)
+    except Exception as e:
+        _record_error(e)
+    return written
 
 
 def address_cache_delete(key: str) -> None:
-    """Delete a single key from the address cache. No-op if Redis unavailable."""
+    """Delete a single key from L1 and Redis, and tell other workers to drop it from their L1."""
+    _local_cache.delete(key)
     r = get_redis()
     if r is None:
         return
     try:
-        r.delete(key)
-    except Exception:
-        pass
+        r.unlink(_physical_key(r, key))
+    except Exception as e:
+        _record_error(e)
+    _publish_invalidation(r, f"key:{key}")
 
 
-def address_cache_delete_pattern(pattern: str) -> None:
-    """Delete all keys matching pattern (e.g. address:provinces:*). No-op if Redis unavailable."""
+def address_cache_invalidate_level(level: str) -> None:
+    """Invalidate every key of one level (e.g. "provinces") in O(1) by bumping its generation counter."""
+    _local_cache.delete_pattern(f"address:{level}:*")
+    if level == "derived":
+        _drop_derived()
     r = get_redis()
     if r is None:
         return
     try:
-        keys = r.keys(pattern)
-        if keys:
-            r.delete(*keys)
-    except Exception:
-        pass
+        _generations[level] = int(r.incr(f"address:gen:{level}"))
+    except Exception as e:
+        _record_error(e)
+        _generations.pop(level, None)
+        return
+    _publish_invalidation(r, f"gen:{level}:{_generations[level]}")
+
+
+def address_cache_delete_pattern(pattern: str, batch_size: int = 500) -> int:
+    """
+    Delete all keys matching a logical pattern (e.g. address:provinces:*) across every generation using
+    cursor-based SCAN and batched UNLINK, so Redis is never blocked. Returns the number of keys unlinked.
+    """
+    _local_cache.delete_pattern(pattern)
+    r = get_redis()
+    if r is None:
+        return 0
+    deleted = 0
+    try:
+        batch: list[str] = []
+        for k in r.scan_iter(match=f"address:v*:{pattern.split(':', 1)[1]}", count=batch_size):
+            batch.append(k)
+            if len(batch) >= batch_size:
+                deleted += r.unlink(*batch)
+                batch = []
+        if batch:
+            deleted += r.unlink(*batch)
+    except Exception as e:
+        _record_error(e)
+    _publish_invalidation(r, f"pattern:{pattern}")
+    return deleted
+
+
+def _apply_invalidation(message: str) -> None:
+    kind, _, target = message.partition(":")
+    if kind == "key":
+        _local_cache.delete(target)
+    elif kind == "pattern":
+        _local_cache.delete_pattern(target)
+    elif kind == "gen":
+        level, _, gen = target.rpartition(":")
+        if gen.isdigit():
+            _generations[level] = int(gen)
+        else:
+            _generations.pop(level, None)
+        _local_cache.delete_pattern(f"address:{level}:*")
+        if level == "derived":
+            _drop_derived()
+    else:
+        _local_cache.clear()
+        _drop_derived()
+
+
+_listener_thread: threading.Thread | None = None
+_listener_stop = threading.Event()
+
+
+def _listen_for_invalidations() -> None:
+    while not _listener_stop.is_set():
+        r = get_redis()
+        if r is None:
+            _listener_stop.wait(5)
+            continue
+        pubsub = None
+        try:
+            pubsub = r.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(ADDRESS_INVALIDATE_CHANNEL)
+            # Messages published while we were not subscribed are lost; start from a clean L1
+            _local_cache.clear()
+            _drop_derived()
+            _generations.clear()
+            while not _listener_stop.is_set():
+                message = pubsub.get_message(timeout=1.0)
+                if message and message.get("type") == "message":
+                    data = message.get("data") or b""
+                    _apply_invalidation(data.decode("utf-8") if isinstance(data, bytes) else str(data))
+        except Exception:
+            logger.warning("Address cache invalidation listener lost connection; retrying", exc_info=True)
+            _listener_stop.wait(5)
+        finally:
+            if pubsub is not None:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+
+
+def start_address_invalidation_listener() -> None:
+    """Start the background pub/sub subscriber that evicts L1 entries. No-op if REDIS_URL is unset."""
+    global _listener_thread
+    if not _redis_configured():
+        return
+    if _listener_thread is not None and _listener_thread.is_alive():
+        return
+    _listener_stop.clear()
+    _listener_thread = threading.Thread(
+        target=_listen_for_invalidations, name="address-cache-invalidation", daemon=True
+    )
+    _listener_thread.start()
+
+
+def stop_address_invalidation_listener() -> None:
+    """Signal the subscriber thread to exit and wait briefly for it."""
+    global _listener_thread
+    _listener_stop.set()
+    if _listener_thread is not None:
+        _listener_thread.join(timeout=2)
+        _listener_thread = None
 
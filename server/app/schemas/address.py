@@ -1,5 +1,7 @@
 """Schemas for address reference data CRUD."""
 
+from typing import Optional
+
 from pydantic import BaseModel, Field
 
 
@@ -33,3 +35,26 @@ class AddressBarangayCreate(BaseModel):
     code: str = Field(..., min_length=1, max_length=16)
     name: str = Field(..., min_length=1, max_length=255)
     municipal_code: str = Field(..., min_length=1, max_length=14)
+
+
+class AddressCodes(BaseModel):
+    """One address code tuple to resolve; any level may be omitted."""
+    region_code: Optional[str] = None
+    province_code: Optional[str] = None
+    municipal_code: Optional[str] = None
+    barangay_code: Optional[str] = None
+
+
+class AddressResolveRequest(BaseModel):
+    """Batch of code tuples to validate and resolve to names."""
+    items: list[AddressCodes] = Field(..., max_length=10000)
+
+
+class AddressResolveResult(BaseModel):
+    """Names for each provided code (None if omitted or unknown) and consistency errors."""
+    valid: bool
+    errors: list[str]
+    region_name: Optional[str] = None
+    province_name: Optional[str] = None
+    municipal_name: Optional[str] = None
+    barangay_name: Optional[str] = None
@@ -41,3 +41,14 @@ class BeneficiaryResponse(BeneficiaryBase):
     model_config = ConfigDict(from_attributes=True)
 
     id: int
+
+
+class DuplicateCandidate(BaseModel):
+    source: str  # "beneficiary" or "application"
+    id: str
+    last_name: Optional[str] = None
+    first_name: Optional[str] = None
+    middle_name: Optional[str] = None
+    birth_date: Optional[date] = None
+    score: float
+    reasons: list[str]
@@ -0,0 +1,28 @@
+"""Schemas for bulk create/upsert endpoints."""
+
+from typing import Any, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class BulkRequest(BaseModel):
+    """Rows are validated one by one so a bad row is reported instead of rejecting the whole request."""
+    items: list[dict[str, Any]] = Field(..., max_length=5000)
+    mode: Literal["insert", "upsert"] = "insert"
+    # Upsert match field, where the endpoint offers a choice (beneficiaries: bin or common_code)
+    key: Optional[str] = None
+
+
+class BulkRowResult(BaseModel):
+    """Outcome for items[index]: id of the written row, or the reasons it was skipped."""
+    index: int
+    status: Literal["inserted", "updated", "error"]
+    id: Optional[int] = None
+    errors: list[str] = []
+
+
+class BulkResult(BaseModel):
+    inserted: int
+    updated: int
+    failed: int
+    rows: list[BulkRowResult]
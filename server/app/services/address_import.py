@@ -0,0 +1,143 @@
+"""
+Bulk address import: stream the PSGC CSVs into Postgres with COPY, merge with one upsert per table,
+and invalidate only the cache keys whose children changed.
+
+Usable from code (import_address_csvs) or as a command from the server directory:
+
+    python -m app.services.address_import [--data-dir PATH]
+
+Rows present in the tables but missing from the CSVs are left untouched.
+"""
+
+import argparse
+import csv
+import json
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from sqlalchemy import text
+
+from app.services.address_service import invalidate_address_parents
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
+# CSVs live in server/address_data/ relative to server app
+_ADDRESS_DATA_DIR = Path(__file__).resolve().parent.parent.parent / "address_data"
+
+# (label, csv file, table, code column, name column, parent column)
+_TABLES = (
+    ("regions", "adm1_regions.csv", "address_regions", "adm1_pcode", "adm1_en", "adm0_pcode"),
+    ("provinces", "adm2_provinces.csv", "address_provinces", "adm2_pcode", "adm2_en", "adm1_pcode"),
+    ("municipalities", "adm3_municipalities.csv", "address_municipalities", "adm3_pcode", "adm3_en", "adm2_pcode"),
+    ("barangays", "adm4_barangays.csv", "address_barangays", "adm4_pcode", "adm4_en", "adm3_pcode"),
+)
+
+
+def copy_from_file(cursor, sql: str, f) -> None:
+    """COPY ... FROM STDIN for psycopg2 (copy_expert) or psycopg 3 (cursor.copy)."""
+    if hasattr(cursor, "copy_expert"):
+        cursor.copy_expert(sql, f)
+        return
+    with cursor.copy(sql) as copy:
+        while chunk := f.read(65536):
+            copy.write(chunk)
+
+
+def _import_table(db: "Session", path: Path, table: str, code: str, name: str, parent: str) -> dict:
+    with open(path, newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f), [])
+        missing = {code, name, parent} - {h.strip() for h in header}
+        if missing:
+            raise ValueError(f"{path.name}: missing columns {sorted(missing)}")
+        f.seek(0)
+        stage = f"stage_{table}"
+        db.execute(text(f"CREATE TEMP TABLE {stage} ({', '.join(f'{h.strip()} text' for h in header)}) ON COMMIT DROP"))
+        cursor = db.connection().connection.cursor()
+        try:
+            copy_from_file(cursor, f"COPY {stage} FROM STDIN WITH (FORMAT csv, HEADER true)", f)
+        finally:
+            cursor.close()
+
+    # Trim and de-duplicate once, then diff against the live table to learn old parents of moved rows
+    db.execute(text(f"""
+        CREATE TEMP TABLE {stage}_clean ON COMMIT DROP AS
+        SELECT DISTINCT ON (c) c AS code, n AS name, p AS parent
+        FROM (SELECT trim({code}) AS c, trim(coalesce({name}, '')) AS n, trim(coalesce({parent}, '')) AS p FROM {stage}) s
+        WHERE c <> ''
+        ORDER BY c
+    """))
+    staged = db.execute(text(f"SELECT count(*) FROM {stage}_clean")).scalar_one()
+    changes = db.execute(text(f"""
+        SELECT s.parent, t.{parent}
+        FROM {stage}_clean s LEFT JOIN {table} t ON t.{code} = s.code
+        WHERE t.{code} IS NULL OR (t.{name}, t.{parent}) IS DISTINCT FROM (s.name, s.parent)
+    """)).all()
+    merged = db.execute(text(f"""
+        INSERT INTO {table} ({code}, {name}, {parent})
+        SELECT code, name, parent FROM {stage}_clean
+        ON CONFLICT ({code}) DO UPDATE SET {name} = EXCLUDED.{name}, {parent} = EXCLUDED.{parent}
+        WHERE ({table}.{name}, {table}.{parent}) IS DISTINCT FROM (EXCLUDED.{name}, EXCLUDED.{parent})
+        RETURNING (xmax = 0) AS inserted
+    """)).all()
+    inserted = sum(1 for (was_insert,) in merged if was_insert)
+    affected = {p or "" for row in changes for p in row if p is not None}
+    return {
+        "staged": staged,
+        "inserted": inserted,
+        "updated": len(merged) - inserted,
+        "unchanged": staged - len(merged),
+        "affected_parents": affected,
+    }
+
+
+def import_address_csvs(db: "Session", data_dir: Path = _ADDRESS_DATA_DIR) -> dict:
+    """
+    COPY the four PSGC CSVs into staging tables and upsert them into the address tables in one transaction.
+    Returns inserted/updated/unchanged counts and elapsed time per level; invalidates only affected cache keys
+    after commit.
+    """
+    report: dict = {"levels": {}}
+    changed: dict[int, set[str]] = {}
+    started_all = time.perf_counter()
+    try:
+        # Lifted for this transaction only: the barangay merge alone can outlast DB_STATEMENT_TIMEOUT
+        db.execute(text("SET LOCAL statement_timeout = 0"))
+        for level, (label, fname, table, code, name, parent) in enumerate(_TABLES):
+            path = data_dir / fname
+            if not path.exists():
+                report["levels"][label] = {"skipped": f"{fname} not found"}
+                continue
+            started = time.perf_counter()
+            result = _import_table(db, path, table, code, name, parent)
+            # Regions hang off adm0 (the country); their list is a single key
+            affected = result.pop("affected_parents")
+            changed[level] = ({""} if affected else set()) if level == 0 else affected
+            result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            report["levels"][label] = result
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    invalidate_address_parents(changed)
+    report["elapsed_ms"] = round((time.perf_counter() - started_all) * 1000, 1)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import/resync PSGC address CSVs into the address tables.")
+    parser.add_argument("--data-dir", type=Path, default=_ADDRESS_DATA_DIR, help="directory with adm1..adm4 CSVs")
+    args = parser.parse_args()
+
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        print(json.dumps(import_address_csvs(db, args.data_dir), indent=2))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
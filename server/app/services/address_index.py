@@ -0,0 +1,86 @@
+"""
+In-process address hierarchy index built once from the PSGC CSVs.
+
+Maps each parent code to an immutable tuple of (code, name) children for all four levels
+(regions are keyed under ""), so CSV fallbacks are dictionary lookups instead of file scans.
+The index is never mutated after build; readers share it across threads without locking.
+"""
+
+import csv
+import threading
+from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping
+
+# CSVs live in server/address_data/ relative to server app
+_ADDRESS_DATA_DIR = Path(__file__).resolve().parent.parent.parent / "address_data"
+
+# (file, code column, name column, parent column); regions have no parent
+_LEVELS: tuple[tuple[str, str, str, str | None], ...] = (
+    ("adm1_regions.csv", "adm1_pcode", "adm1_en", None),
+    ("adm2_provinces.csv", "adm2_pcode", "adm2_en", "adm1_pcode"),
+    ("adm3_municipalities.csv", "adm3_pcode", "adm3_en", "adm2_pcode"),
+    ("adm4_barangays.csv", "adm4_pcode", "adm4_en", "adm3_pcode"),
+)
+
+Children = tuple[tuple[str, str], ...]
+
+
+class AddressIndex:
+    """Immutable parent-code -> children index for regions, provinces, municipalities, barangays."""
+
+    __slots__ = ("_levels",)
+
+    def __init__(self, levels: tuple[Mapping[str, Children], ...]):
+        self._levels = levels
+
+    def children(self, level: int, parent_code: str) -> Children:
+        """Children at level (0=regions .. 3=barangays) under parent_code. Empty tuple if unknown."""
+        return self._levels[level].get(parent_code, ())
+
+    def regions(self) -> Children:
+        return self.children(0, "")
+
+    def provinces(self, region_code: str) -> Children:
+        return self.children(1, region_code)
+
+    def municipalities(self, province_code: str) -> Children:
+        return self.children(2, province_code)
+
+    def barangays(self, municipal_code: str) -> Children:
+        return self.children(3, municipal_code)
+
+
+def _read_level(path: Path, code_col: str, name_col: str, parent_col: str | None) -> Mapping[str, Children]:
+    grouped: dict[str, list[tuple[str, str]]] = {}
+    if path.exists():
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                pcode = (row.get(code_col) or "").strip()
+                if not pcode:
+                    continue
+                parent = (row.get(parent_col) or "").strip() if parent_col else ""
+                name = (row.get(name_col) or "").strip()
+                grouped.setdefault(parent, []).append((pcode, name))
+    return MappingProxyType({parent: tuple(items) for parent, items in grouped.items()})
+
+
+def build_address_index(data_dir: Path = _ADDRESS_DATA_DIR) -> AddressIndex:
+    """Read all four CSVs once and return a frozen index."""
+    return AddressIndex(
+        tuple(_read_level(data_dir / fname, code, name, parent) for fname, code, name, parent in _LEVELS)
+    )
+
+
+_index: AddressIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_address_index() -> AddressIndex:
+    """Return the shared index, building it on first use (double-checked so only one thread builds)."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = build_address_index()
+    return _index
@@ -0,0 +1,111 @@
+"""
+In-memory typeahead index over address names (provinces, municipalities, barangays).
+
+Names are normalized (lowercase, accents and ñ folded, common PSGC abbreviations such as "Pob." expanded)
+and indexed two ways: a sorted token list for prefix matching, and trigram postings as a typo-tolerant
+fallback. Built once from (level, code, name) rows; immutable afterwards and safe to share across threads.
+"""
+
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+
+_ABBREVIATIONS = {
+    "pob": "poblacion",
+    "sto": "santo",
+    "sta": "santa",
+    "gen": "general",
+    "brgy": "barangay",
+    "bgy": "barangay",
+}
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+# The PSGC CSVs carry ñ/Ñ as UTF-8 bytes mis-decoded through cp437
+_MOJIBAKE = {"├▒": "n", "├æ": "n"}
+
+# Trigrams shared by more names than this carry little signal and are skipped in the fallback
+_COMMON_TRIGRAM_LIMIT = 4000
+
+
+def normalize_name(value: str) -> str:
+    """Lowercase, fold accents (ñ -> n), expand abbreviations, collapse punctuation to single spaces."""
+    folded = value or ""
+    for broken, fixed in _MOJIBAKE.items():
+        folded = folded.replace(broken, fixed)
+    folded = unicodedata.normalize("NFKD", folded.lower())
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    tokens = _NON_ALNUM.sub(" ", folded).split()
+    return " ".join(_ABBREVIATIONS.get(t, t) for t in tokens)
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class AddressSearchIndex:
+    """Prefix + trigram index; entries are (level, code, name) tuples addressed by position."""
+
+    def __init__(self, entries: list[tuple[int, str, str]]):
+        self.entries = entries
+        self._normalized = [normalize_name(name) for _, _, name in entries]
+        tokens: list[tuple[str, int]] = []
+        postings: dict[str, list[int]] = {}
+        self._trigram_counts: list[int] = []
+        for entry_id, norm in enumerate(self._normalized):
+            for token in set(norm.split()):
+                tokens.append((token, entry_id))
+            grams = _trigrams(norm)
+            self._trigram_counts.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(entry_id)
+        tokens.sort()
+        self._tokens = [t for t, _ in tokens]
+        self._token_ids = [i for _, i in tokens]
+        self._postings = postings
+
+    def _prefix_ids(self, prefix: str) -> set[int]:
+        lo = bisect_left(self._tokens, prefix)
+        hi = bisect_left(self._tokens, prefix + "\uffff", lo)
+        return set(self._token_ids[lo:hi])
+
+    def search(self, query: str, limit: int = 10) -> list[tuple[float, int]]:
+        """Ranked (score, entry_id) pairs. Every query token must prefix some name token; falls back to
+        trigram similarity when that finds fewer than limit names."""
+        norm = normalize_name(query)
+        if not norm:
+            return []
+        scored: dict[int, float] = {}
+
+        candidates: set[int] | None = None
+        for token in sorted(set(norm.split()), key=len, reverse=True):
+            ids = self._prefix_ids(token)
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                break
+        for entry_id in candidates or ():
+            name = self._normalized[entry_id]
+            if name == norm:
+                score = 3.0
+            elif name.startswith(norm):
+                score = 2.0
+            else:
+                score = 1.0
+            scored[entry_id] = score - len(name) / 1000.0
+
+        if len(scored) < limit:
+            grams = _trigrams(norm)
+            usable = [g for g in grams if len(self._postings.get(g, ())) <= _COMMON_TRIGRAM_LIMIT]
+            shared = Counter(i for g in usable for i in self._postings.get(g, ()))
+            for entry_id, count in shared.items():
+                if entry_id in scored:
+                    continue
+                similarity = count / (len(grams) + self._trigram_counts[entry_id] - count)
+                if similarity >= 0.3:
+                    scored[entry_id] = similarity
+
+        ranked = heapq.nsmallest(
+            limit, scored.items(), key=lambda kv: (-kv[1], self.entries[kv[0]][0], self._normalized[kv[0]])
+        )
+        return [(round(score, 4), entry_id) for entry_id, score in ranked]
@@ -1,87 +1,71 @@
 """
-Address data service: Redis-first, then load from DB (if session and tables populated) or CSV.
+Address data service: Redis-first, then load from DB (if session and tables populated) or the
+in-memory CSV index (see address_index).
 Returns lists of { "code": str, "name": str }.
 """
 
-import csv
-from pathlib import Path
+import gzip
+import hashlib
+import json
+import time
 from typing import TYPE_CHECKING
 
-from app.redis_client import address_cache_delete, address_cache_delete_pattern, address_cache_get, address_cache_set
+from app.redis_client import (
+    address_cache_delete,
+    address_cache_get,
+    address_cache_invalidate_level,
+    address_cache_set,
+    address_cache_set_many,
+    address_derived_get,
+    address_derived_set,
+    address_derived_version,
+)
+from app.services.address_index import get_address_index
+from app.services.address_search import AddressSearchIndex
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
 
 if TYPE_CHECKING:
     from sqlalchemy.orm import Session
 
-# CSVs live in server/address_data/ relative to server app
-_ADDRESS_DATA_DIR = Path(__file__).resolve().parent.parent.parent / "address_data"
-
 _CACHE_KEY_REGIONS = "address:regions"
 _CACHE_KEY_PROVINCES = "address:provinces:{region_code}"
 _CACHE_KEY_MUNICIPALITIES = "address:municipalities:{province_code}"
 _CACHE_KEY_BARANGAYS = "address:barangays:{municipal_code}"
+# Derived structures held per process only, until the "derived" level is invalidated (see redis_client)
+_CACHE_KEY_TREE = "address:derived:tree:{region_code}"
+_CACHE_KEY_CODE_INDEX = "address:derived:codes"
+_CACHE_KEY_SEARCH_INDEX = "address:derived:search"
 _CACHE_TTL = 86400 * 7  # 7 days
 
 
+def _as_items(children: tuple[tuple[str, str], ...]) -> list[dict[str, str]]:
+    return [{"code": code, "name": name} for code, name in children]
+
+
 def _load_regions_csv() -> list[dict[str, str]]:
-    out: list[dict[str, str]] = []
-    path = _ADDRESS_DATA_DIR / "adm1_regions.csv"
-    if not path.exists():
-        return out
-    with open(path, newline="", encoding="utf-8") as f:
-        for row in csv.DictReader(f):
-            pcode = (row.get("adm1_pcode") or "").strip()
-            name = (row.get("adm1_en") or "").strip()
-            if pcode:
-                out.append({"code": pcode, "name": name})
-    return out
+    return _as_items(get_address_index().regions())
 
 
 def _load_provinces_csv(region_code: str) -> list[dict[str, str]]:
-    out: list[dict[str, str]] = []
-    path = _ADDRESS_DATA_DIR / "adm2_provinces.csv"
-    if not path.exists() or not region_code:
-        return out
-    with open(path, newline="", encoding="utf-8") as f:
-        for row in csv.DictReader(f):
-            if (row.get("adm1_pcode") or "").strip() != region_code:
-                continue
-            pcode = (row.get("adm2_pcode") or "").strip()
-            name = (row.get("adm2_en") or "").strip()
-            if pcode:
-                out.append({"code": pcode, "name": name})
-    return out
+    if not region_code:
+        return []
+    return _as_items(get_address_index().provinces(region_code))
 
 
 def _load_municipalities_csv(province_code: str) -> list[dict[str, str]]:
-    out: list[dict[str, str]] = []
-    path = _ADDRESS_DATA_DIR / "adm3_municipalities.csv"
-    if not path.exists() or not province_code:
-        return out
-    with open(path, newline="", encoding="utf-8") as f:
-        for row in csv.DictReader(f):
-            if (row.get("adm2_pcode") or "").strip() != province_code:
-                continue
-            pcode = (row.get("adm3_pcode") or "").strip()
-            name = (row.get("adm3_en") or "").strip()
-            if pcode:
-                out.append({"code": pcode, "name": name})
-    return out
+    if not province_code:
+        return []
+    return _as_items(get_address_index().municipalities(province_code))
 
 
 def _load_barangays_csv(municipal_code: str) -> list[dict[str, str]]:
-    out: list[dict[str, str]] = []
-    path = _ADDRESS_DATA_DIR / "adm4_barangays.csv"
-    if not path.exists() or not municipal_code:
-        return out
-    with open(path, newline="", encoding="utf-8") as f:
-        for row in csv.DictReader(f):
-            if (row.get("adm3_pcode") or "").strip() != municipal_code:
-                continue
-            pcode = (row.get("adm4_pcode") or "").strip()
-            name = (row.get("adm4_en") or "").strip()
-            if pcode:
-                out.append({"code": pcode, "name": name})
-    return out
+    if not municipal_code:
+        return []
+    return _as_items(get_address_index().barangays(municipal_code))
 
 
 def _load_regions_db(db: "Session") -> list[dict[str, str]] | None:
@@ -185,42 +169,287 @@ def get_barangays(municipal_code: str, db: "Session | None" = None) -> list[dict
     return data
 
 
-def warm_address_cache(db: "Session | None" = None) -> None:
-    """Preload all address data into Redis from DB or CSV."""
-    regions = get_regions(db)
-    for r in regions:
-        provs = get_provinces(r["code"], db)
-        for p in provs:
-            muns = get_municipalities(p["code"], db)
-            for m in muns:
-                get_barangays(m["code"], db)
+def _load_level_db(db: "Session", level: int) -> list[tuple[str, str, str]]:
+    """All (parent, code, name) rows of one address table in a single query, ordered by code."""
+    from app.models import AddressBarangay, AddressMunicipality, AddressProvince, AddressRegion
+    model, code_col, name_col, parent_col = (
+        (AddressRegion, AddressRegion.adm1_pcode, AddressRegion.adm1_en, None),
+        (AddressProvince, AddressProvince.adm2_pcode, AddressProvince.adm2_en, AddressProvince.adm1_pcode),
+        (AddressMunicipality, AddressMunicipality.adm3_pcode, AddressMunicipality.adm3_en, AddressMunicipality.adm2_pcode),
+        (AddressBarangay, AddressBarangay.adm4_pcode, AddressBarangay.adm4_en, AddressBarangay.adm3_pcode),
+    )[level]
+    if parent_col is None:
+        rows = db.query(code_col, name_col).order_by(code_col).all()
+        return [("", code, name) for code, name in rows]
+    rows = db.query(parent_col, code_col, name_col).order_by(code_col).all()
+    return [(parent, code, name) for parent, code, name in rows]
+
+
+def _load_level_csv(level: int, parent_codes: list[str]) -> list[tuple[str, str, str]]:
+    index = get_address_index()
+    return [(parent, code, name) for parent in parent_codes for code, name in index.children(level, parent)]
+
+
+# (report label, cache key template, template parameter naming the parent code)
+_WARM_LEVELS = (
+    ("regions", _CACHE_KEY_REGIONS, None),
+    ("provinces", _CACHE_KEY_PROVINCES, "region_code"),
+    ("municipalities", _CACHE_KEY_MUNICIPALITIES, "province_code"),
+    ("barangays", _CACHE_KEY_BARANGAYS, "municipal_code"),
+)
+
+
+def _address_source(db: "Session | None") -> str:
+    """"db" when a session is given and the address tables are populated, else "csv"."""
+    if db is not None:
+        try:
+            if _load_level_db(db, 0):
+                return "db"
+        except Exception:
+            pass
+    return "csv"
+
+
+def warm_address_cache(db: "Session | None" = None) -> dict:
+    """
+    Preload all address data into the cache from DB or CSV in bulk: one query per table, children
+    grouped by parent in memory, keys written with pipelined batches. Returns per-level counts and timings.
+    """
+    source = _address_source(db)
+    report: dict = {"source": source, "levels": {}}
+    parent_codes = [""]
+    for level, (label, key_template, param) in enumerate(_WARM_LEVELS):
+        started = time.perf_counter()
+        rows = _load_level_db(db, level) if source == "db" else _load_level_csv(level, parent_codes)
+        grouped: dict[str, list[dict[str, str]]] = {parent: [] for parent in parent_codes}
+        for parent, code, name in rows:
+            if parent in grouped:
+                grouped[parent].append({"code": code, "name": name})
+        if param is None:
+            entries = {key_template: grouped[""]}
+        else:
+            entries = {key_template.format(**{param: parent}): items for parent, items in grouped.items()}
+        written = address_cache_set_many(entries, _CACHE_TTL)
+        report["levels"][label] = {
+            "items": sum(len(items) for items in grouped.values()),
+            "keys": len(entries),
+            "redis_keys_written": written,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        parent_codes = [code for _, code, _ in rows]
+    return report
+
+
+class AddressTree:
+    """Serialized address tree: precompressed bodies and their strong ETags, both keyed by content-encoding."""
+
+    __slots__ = ("etags", "bodies")
+
+    def __init__(self, body: bytes):
+        self.bodies: dict[str, bytes] = {"identity": body, "gzip": gzip.compress(body, 6)}
+        if brotli is not None:
+            self.bodies["br"] = brotli.compress(body)
+        # Strong validators must differ per representation, so compressed bodies get an encoding suffix
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.etags = {
+            encoding: f'"{digest}"' if encoding == "identity" else f'"{digest}-{encoding}"' for encoding in self.bodies
+        }
+
+
+def get_address_tree(db: "Session | None" = None, region_code: str | None = None) -> AddressTree:
+    """
+    Whole hierarchy (or one region) as compact nested arrays:
+    {"regions": [[code, name, [[code, name, [[code, name, [[code, name], ...]], ...]], ...]], ...]}.
+    Built with one query per table and held by the process until any address level is invalidated.
+    ETags hash the body, so every worker serving the same data returns the same tags.
+    """
+    key = _CACHE_KEY_TREE.format(region_code=region_code or "all")
+    cached = address_derived_get(key)
+    if cached is not None:
+        return cached
+    version = address_derived_version()
+
+    source = _address_source(db)
+    parent_codes = [""]
+    levels: list[dict[str, list[list]]] = []
+    for level in range(4):
+        rows = _load_level_db(db, level) if source == "db" else _load_level_csv(level, parent_codes)
+        if level == 0 and region_code:
+            rows = [row for row in rows if row[1] == region_code]
+        wanted = set(parent_codes)
+        grouped: dict[str, list[list]] = {}
+        for parent, code, name in rows:
+            if parent in wanted:
+                grouped.setdefault(parent, []).append([code, name])
+        levels.append(grouped)
+        parent_codes = [node[0] for nodes in grouped.values() for node in nodes]
+
+    # Attach children bottom-up; barangays stay [code, name]
+    for level in range(2, -1, -1):
+        for nodes in levels[level].values():
+            for node in nodes:
+                node.append(levels[level + 1].get(node[0], []))
+    body = json.dumps({"regions": levels[0].get("", [])}, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    tree = AddressTree(body)
+    address_derived_set(key, tree, version)
+    return tree
+
+
+_LEVEL_FIELDS = ("region", "province", "municipal", "barangay")
+
+
+def _get_code_index(db: "Session | None") -> tuple[dict[str, tuple[str, str]], ...]:
+    """Per level: code -> (name, parent code). One query per table; cached per process."""
+    cached = address_derived_get(_CACHE_KEY_CODE_INDEX)
+    if cached is not None:
+        return cached
+    version = address_derived_version()
+    source = _address_source(db)
+    parent_codes = [""]
+    index: list[dict[str, tuple[str, str]]] = []
+    for level in range(4):
+        rows = _load_level_db(db, level) if source == "db" else _load_level_csv(level, parent_codes)
+        index.append({code: (name, parent) for parent, code, name in rows})
+        parent_codes = list(index[-1])
+    result = tuple(index)
+    address_derived_set(_CACHE_KEY_CODE_INDEX, result, version)
+    return result
+
+
+def resolve_codes(db: "Session | None", items: list[dict[str, str | None]]) -> list[dict]:
+    """
+    Resolve region/province/municipal/barangay code tuples to names in one pass and check that each
+    code exists and descends from the nearest code given above it. Returns one result per item, in order:
+    { "valid", "errors", "region_name", "province_name", "municipal_name", "barangay_name" }.
+    """
+    index = _get_code_index(db)
+    results: list[dict] = []
+    for item in items:
+        errors: list[str] = []
+        result: dict = {}
+        above: tuple[int, str, str] | None = None  # nearest provided ancestor: (level, field, code)
+        for level, field in enumerate(_LEVEL_FIELDS):
+            code = (item.get(f"{field}_code") or "").strip()
+            result[f"{field}_name"] = None
+            if not code:
+                continue
+            entry = index[level].get(code)
+            if entry is None:
+                errors.append(f"Unknown {field}_code {code!r}")
+            else:
+                result[f"{field}_name"] = entry[0]
+                if above is not None:
+                    # Walk up from the direct parent to the level of the nearest provided ancestor
+                    ancestor = entry[1]
+                    for lv in range(level - 1, above[0], -1):
+                        ancestor = index[lv].get(ancestor, ("", ""))[1]
+                    if ancestor != above[2]:
+                        errors.append(f"{field}_code {code!r} does not belong to {above[1]}_code {above[2]!r}")
+            above = (level, field, code)
+        result["valid"] = not errors
+        result["errors"] = errors
+        results.append(result)
+    return results
+
+
+def _get_search_index(db: "Session | None") -> AddressSearchIndex:
+    cached = address_derived_get(_CACHE_KEY_SEARCH_INDEX)
+    if cached is not None:
+        return cached
+    version = address_derived_version()
+    code_index = _get_code_index(db)
+    entries = [(level, code, name) for level in (1, 2, 3) for code, (name, _) in code_index[level].items()]
+    index = AddressSearchIndex(entries)
+    address_derived_set(_CACHE_KEY_SEARCH_INDEX, index, version)
+    return index
+
+
+def search_addresses(db: "Session | None", q: str, limit: int = 10) -> list[dict]:
+    """
+    Typeahead over province, municipality and barangay names ("Pob." and ñ/n variants match).
+    Each hit carries its level, score and the codes/names of every level above it.
+    """
+    if len((q or "").strip()) < 2:
+        return []
+    code_index = _get_code_index(db)
+    search_index = _get_search_index(db)
+    out: list[dict] = []
+    for score, entry_id in search_index.search(q, limit):
+        level, code, name = search_index.entries[entry_id]
+        hit: dict = {"level": _LEVEL_FIELDS[level], "code": code, "name": name, "score": score}
+        for field in _LEVEL_FIELDS:
+            hit[f"{field}_code"] = None
+            hit[f"{field}_name"] = None
+        current = code
+        for lv in range(level, -1, -1):
+            entry = code_index[lv].get(current)
+            if entry is None:
+                break
+            hit[f"{_LEVEL_FIELDS[lv]}_code"] = current
+            hit[f"{_LEVEL_FIELDS[lv]}_name"] = entry[0]
+            current = entry[1]
+        out.append(hit)
+    return out
 
 
 # --- CRUD: create / update / delete (DB only, then invalidate Redis) ---
 
+def _invalidate_derived() -> None:
+    address_cache_invalidate_level("derived")
+
+
 def _invalidate_regions() -> None:
     address_cache_delete(_CACHE_KEY_REGIONS)
+    _invalidate_derived()
 
 
 def _invalidate_provinces(region_code: str | None = None) -> None:
     if region_code:
         address_cache_delete(_CACHE_KEY_PROVINCES.format(region_code=region_code))
     else:
-        address_cache_delete_pattern("address:provinces:*")
+        address_cache_invalidate_level("provinces")
+    _invalidate_derived()
 
 
 def _invalidate_municipalities(province_code: str | None = None) -> None:
     if province_code:
         address_cache_delete(_CACHE_KEY_MUNICIPALITIES.format(province_code=province_code))
     else:
-        address_cache_delete_pattern("address:municipalities:*")
+        address_cache_invalidate_level("municipalities")
+    _invalidate_derived()
 
 
 def _invalidate_barangays(municipal_code: str | None = None) -> None:
     if municipal_code:
         address_cache_delete(_CACHE_KEY_BARANGAYS.format(municipal_code=municipal_code))
     else:
-        address_cache_delete_pattern("address:barangays:*")
+        address_cache_invalidate_level("barangays")
+    _invalidate_derived()
+
+
+# Above this many parents a whole-level generation bump is cheaper than per-key deletes
+_BULK_INVALIDATE_THRESHOLD = 200
+
+
+def invalidate_address_parents(changed: dict[int, set[str]]) -> None:
+    """
+    Invalidate cached child lists after a bulk change. changed maps level (0=regions .. 3=barangays) to the
+    parent codes whose children changed (use "" for regions).
+    """
+    if not any(changed.values()):
+        return
+    if changed.get(0):
+        address_cache_delete(_CACHE_KEY_REGIONS)
+    for level, (label, key_template, param) in enumerate(_WARM_LEVELS):
+        parents = changed.get(level) or set()
+        if level == 0 or not parents:
+            continue
+        if len(parents) > _BULK_INVALIDATE_THRESHOLD:
+            address_cache_invalidate_level(label)
+        else:
+            for parent in parents:
+                address_cache_delete(key_template.format(**{param: parent}))
+    _invalidate_derived()
 
 
 class AddressConflictError(Exception):
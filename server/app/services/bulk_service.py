@@ -0,0 +1,183 @@
+"""
+Bulk create/upsert for legacy record migration.
+
+Each batch is written in one transaction: rows are validated against the Create schema and the column limits up
+front, then inserted with a single multi-row INSERT ... RETURNING and updated with one executemany UPDATE by
+primary key. Invalid rows are reported per index and skipped; if the database still rejects the batch, it is
+retried row by row under savepoints so only the offending rows fail.
+"""
+
+from typing import TYPE_CHECKING, Any
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import String, func, insert, select, text, tuple_, update
+from sqlalchemy.exc import DBAPIError
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
+
+def validation_messages(exc: ValidationError) -> list[str]:
+    return [f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in exc.errors(include_url=False)]
+
+
+def column_length_errors(model, data: dict[str, Any]) -> list[str]:
+    """Fields whose string value is longer than the model's varchar column allows."""
+    errors = []
+    for field, value in data.items():
+        column_type = model.__table__.c[field].type
+        if isinstance(value, str) and isinstance(column_type, String) and column_type.length:
+            if len(value) > column_type.length:
+                errors.append(f"{field}: at most {column_type.length} characters")
+    return errors
+
+
+def _db_message(exc: DBAPIError) -> str:
+    return str(exc.orig).strip().splitlines()[0] if exc.orig is not None else str(exc)
+
+
+class _Batch:
+    def __init__(self, size: int):
+        self.rows: list[dict] = [{"index": i, "status": "error", "id": None, "errors": []} for i in range(size)]
+
+    def fail(self, index: int, errors: list[str]) -> None:
+        self.rows[index].update(status="error", errors=errors)
+
+    def done(self, index: int, status: str, row_id: int) -> None:
+        self.rows[index].update(status=status, id=row_id, errors=[])
+
+    def result(self) -> dict:
+        counts = {"inserted": 0, "updated": 0, "error": 0}
+        for row in self.rows:
+            counts[row["status"]] += 1
+        return {
+            "inserted": counts["inserted"],
+            "updated": counts["updated"],
+            "failed": counts["error"],
+            "rows": self.rows,
+        }
+
+
+def _existing_parents(db: "Session", parent_column, ids: set) -> set:
+    if not ids:
+        return set()
+    statement = select(parent_column).where(parent_column.in_(ids))
+    if "deleted_at" in parent_column.table.c:
+        statement = statement.where(parent_column.table.c.deleted_at.is_(None))
+    return set(db.execute(statement).scalars())
+
+
+def _match_existing(db: "Session", model, key_fields: tuple[str, ...], keyed: dict) -> dict[tuple, list[int]]:
+    """Live rows whose key_fields equal a batch key (string keys compared case-insensitively) -> their ids."""
+    def norm(value):
+        return value.lower() if isinstance(value, str) else value
+
+    columns = [getattr(model, f) for f in key_fields]
+    exprs = [func.lower(c) if isinstance(c.type, String) else c for c in columns]
+    statement = select(model.id, *columns)
+    if len(key_fields) == 1:
+        statement = statement.where(exprs[0].in_({k[0] for k in keyed}))
+    else:
+        statement = statement.where(tuple_(*exprs).in_(list(keyed)))
+    if "deleted_at" in model.__table__.c:
+        statement = statement.where(model.deleted_at.is_(None))
+    found: dict[tuple, list[int]] = {}
+    for row_id, *values in db.execute(statement):
+        found.setdefault(tuple(norm(v) for v in values), []).append(row_id)
+    return found
+
+
+def _write(db: "Session", model, inserts: list[tuple[int, dict]], updates: list[tuple[int, dict]], batch: _Batch):
+    if inserts:
+        ids = db.execute(
+            insert(model).returning(model.id, sort_by_parameter_order=True), [data for _, data in inserts]
+        ).scalars().all()
+        for (index, _), row_id in zip(inserts, ids):
+            batch.done(index, "inserted", row_id)
+    if updates:
+        db.execute(update(model), [data for _, data in updates])
+        for index, data in updates:
+            batch.done(index, "updated", data["id"])
+
+
+def bulk_write(
+    db: "Session",
+    model,
+    schema: type[BaseModel],
+    items: list[dict[str, Any]],
+    key_fields: tuple[str, ...] | None = None,
+    parents: dict[str, Any] | None = None,
+) -> dict:
+    """
+    Insert items (or upsert when key_fields is given: rows matching an existing live row on key_fields update
+    it with the fields they provide). parents maps a foreign-key field to the referenced column, checked up
+    front. Returns per-row results; commits once.
+    """
+    batch = _Batch(len(items))
+    valid: list[tuple[int, dict]] = []
+    for index, item in enumerate(items):
+        try:
+            data = schema.model_validate(item).model_dump(exclude_unset=True)
+        except ValidationError as exc:
+            batch.fail(index, validation_messages(exc))
+            continue
+        errors = column_length_errors(model, data)
+        if key_fields:
+            errors += [f"{f}: required for upsert" for f in key_fields if data.get(f) in (None, "")]
+        if errors:
+            batch.fail(index, errors)
+            continue
+        valid.append((index, data))
+
+    for field, parent_column in (parents or {}).items():
+        known = _existing_parents(db, parent_column, {d[field] for _, d in valid if d.get(field) is not None})
+        kept = []
+        for index, data in valid:
+            if data.get(field) is not None and data[field] not in known:
+                batch.fail(index, [f"{field}: {data[field]} not found"])
+            else:
+                kept.append((index, data))
+        valid = kept
+
+    inserts, updates = valid, []
+    if key_fields and valid:
+        # Serialize concurrent upserts into the same table so two batches cannot both insert one key
+        db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {"name": f"bulk:{model.__tablename__}"})
+
+        def key_of(data):
+            return tuple(data[f].lower() if isinstance(data[f], str) else data[f] for f in key_fields)
+
+        keyed: dict[tuple, int] = {}
+        data_by_index = dict(valid)
+        inserts = []
+        for index, data in valid:
+            key = key_of(data)
+            if key in keyed:
+                batch.fail(index, [f"duplicate {'/'.join(key_fields)} of items[{keyed[key]}] in this batch"])
+                continue
+            keyed[key] = index
+        existing = _match_existing(db, model, key_fields, keyed)
+        for key, index in keyed.items():
+            data = data_by_index[index]
+            matches = existing.get(key, [])
+            if len(matches) > 1:
+                batch.fail(index, [f"{'/'.join(key_fields)} matches {len(matches)} existing rows"])
+            elif matches:
+                updates.append((index, {**data, "id": matches[0]}))
+            else:
+                inserts.append((index, data))
+
+    try:
+        with db.begin_nested():
+            _write(db, model, inserts, updates, batch)
+    except DBAPIError:
+        # Isolate the rows the database rejects (e.g. numeric overflow) without losing the rest
+        single = [([row], []) for row in inserts] + [([], [row]) for row in updates]
+        for row_inserts, row_updates in single:
+            try:
+                with db.begin_nested():
+                    _write(db, model, row_inserts, row_updates, batch)
+            except DBAPIError as exc:
+                batch.fail((row_inserts or row_updates)[0][0], [_db_message(exc)])
+    db.commit()
+    return batch.result()
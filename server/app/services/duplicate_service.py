@@ -0,0 +1,345 @@
+"""
+Duplicate-candidate detection across beneficiaries and applications.
+
+Both tables carry generated name keys (migration 021): last_name_key / first_name_key are normalized
+(accents and ñ folded, "Ma." -> maria, "De La Cruz" = "Delacruz") and name_phonetic merges common
+Spanish/Filipino spelling variants of surname + first given name. Candidates are blocked on an indexed key
+(same birth_date, or same name_phonetic) and only the rows in a block are scored, so neither a lookup nor a
+full scan compares every pair.
+
+Usable from code (find_duplicates / scan_duplicates) or as a batch command from the server directory:
+
+    python -m app.services.duplicate_service [--min-score 0.85] [--chunk-size 5000] > duplicates.csv
+"""
+
+import argparse
+import csv
+import logging
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date
+from difflib import SequenceMatcher
+from itertools import combinations, groupby
+from typing import TYPE_CHECKING, Iterator
+
+from sqlalchemy import Text, case, cast, func, literal, or_, select, text, union_all
+
+from app.models.application import Application
+from app.models.beneficiary import Beneficiary
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Blocks larger than this (e.g. a 1900-01-01 placeholder birth date) are split again by these keys in turn; a
+# block still larger after the last split is scored on its first _MAX_BLOCK rows and reported as truncated
+_MAX_BLOCK = 500
+_SPLIT_KEYS = ("name_phonetic", "last_name_key")
+
+# (source label, model, key column) scanned for candidates
+_SOURCES = (
+    ("beneficiary", Beneficiary, Beneficiary.id),
+    ("application", Application, Application.app_id),
+)
+
+
+@dataclass(frozen=True)
+class PersonKeys:
+    """Normalized name keys of one person, as stored in the generated columns."""
+
+    source: str
+    key: str
+    last_name: str | None
+    first_name: str | None
+    middle_name: str | None
+    birth_date: date | None
+    last_name_key: str | None
+    first_name_key: str | None
+    middle_name_key: str | None
+    name_phonetic: str | None
+
+
+def _ratio(a: str | None, b: str | None) -> float:
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def _given_name_similarity(a: str | None, b: str | None) -> float:
+    """Given names match fully when one is a token subset of the other ("maria cristina" vs "cristina")."""
+    if not a or not b:
+        return 0.0
+    tokens_a, tokens_b = set(a.split()), set(b.split())
+    if tokens_a <= tokens_b or tokens_b <= tokens_a:
+        return 1.0 if tokens_a == tokens_b else 0.9
+    return _ratio(a, b)
+
+
+def score_pair(a: PersonKeys, b: PersonKeys) -> tuple[float, list[str]]:
+    """Similarity in [0, 1] and the reasons that contributed to it."""
+    reasons = []
+    last = _ratio(a.last_name_key, b.last_name_key)
+    first = _given_name_similarity(a.first_name_key, b.first_name_key)
+    if a.name_phonetic and a.name_phonetic == b.name_phonetic:
+        reasons.append("phonetic")
+        last, first = max(last, 0.9), max(first, 0.9)
+    if last == 1.0 and first >= 0.9:
+        reasons.append("name")
+
+    score = 0.45 * last + 0.35 * first
+    if a.birth_date and b.birth_date:
+        if a.birth_date == b.birth_date:
+            score += 0.15
+            reasons.append("birth_date")
+        else:
+            score -= 0.25
+    else:
+        score += 0.05
+    if a.middle_name_key and b.middle_name_key:
+        if a.middle_name_key[0] == b.middle_name_key[0]:
+            score += 0.05
+            reasons.append("middle_initial")
+        else:
+            score -= 0.1
+    else:
+        score += 0.02
+    return round(max(0.0, min(score, 1.0)), 4), reasons
+
+
+def _person_select(source: str, model, key_column):
+    return select(
+        literal(source).label("source"),
+        cast(key_column, Text).label("key"),
+        model.last_name,
+        model.first_name,
+        model.middle_name,
+        model.birth_date,
+        model.last_name_key,
+        model.first_name_key,
+        func.person_name_key(model.middle_name).label("middle_name_key"),
+        model.name_phonetic,
+    ).where(model.deleted_at.is_(None))
+
+
+def _candidate(source: str, key: str, score: float, reasons: list[str], person: PersonKeys) -> dict:
+    return {
+        "source": source,
+        "id": key,
+        "last_name": person.last_name,
+        "first_name": person.first_name,
+        "middle_name": person.middle_name,
+        "birth_date": person.birth_date,
+        "score": score,
+        "reasons": reasons,
+    }
+
+
+def probe_keys(
+    db: "Session",
+    last_name: str | None,
+    first_name: str | None,
+    middle_name: str | None = None,
+    birth_date: date | None = None,
+) -> PersonKeys:
+    """Keys for a person given as raw names, computed by the same SQL functions as the stored columns."""
+    row = db.execute(
+        text(
+            "SELECT replace(person_name_key(:last), ' ', ''), person_name_key(:first), person_name_key(:middle), "
+            "name_phonetic(replace(person_name_key(:last), ' ', '')) || ':' "
+            "|| coalesce(name_phonetic(split_part(person_name_key(:first), ' ', 1)), '')"
+        ),
+        {"last": last_name, "first": first_name, "middle": middle_name},
+    ).one()
+    return PersonKeys("probe", "", last_name, first_name, middle_name, birth_date, *row)
+
+
+def find_duplicates(
+    db: "Session",
+    probe: PersonKeys,
+    limit: int = 20,
+    min_score: float = 0.6,
+    exclude: tuple[str, str] | None = None,
+) -> list[dict]:
+    """
+    Non-deleted beneficiaries and applications resembling probe, best first. Candidates share its birth_date
+    or its name_phonetic (both indexed); exclude=(source, id) skips the probe's own record. Each table yields at
+    most _MAX_BLOCK candidates, those matching the most keys (block keys, then name keys) first.
+    """
+    blocks = []
+    if probe.birth_date is not None:
+        blocks.append("birth_date")
+    if probe.name_phonetic:
+        blocks.append("name_phonetic")
+    if not blocks:
+        return []
+    ranked = blocks + [column for column in ("last_name_key", "first_name_key") if getattr(probe, column)]
+
+    branches = []
+    for source, model, key_column in _SOURCES:
+        conditions = [getattr(model, column) == getattr(probe, column) for column in blocks]
+        matches = sum(case((getattr(model, column) == getattr(probe, column), 1), else_=0) for column in ranked)
+        branches.append(
+            _person_select(source, model, key_column)
+            .where(or_(*conditions))
+            .order_by(matches.desc(), key_column)
+            .limit(_MAX_BLOCK)
+        )
+    found = []
+    for row in db.execute(union_all(*branches)).all():
+        person = PersonKeys(*row)
+        if exclude == (person.source, person.key):
+            continue
+        score, reasons = score_pair(probe, person)
+        if score >= min_score:
+            found.append(_candidate(person.source, person.key, score, reasons, person))
+    found.sort(key=lambda c: c["score"], reverse=True)
+    return found[:limit]
+
+
+def _pair(a: PersonKeys, b: PersonKeys, min_score: float) -> dict | None:
+    score, reasons = score_pair(a, b)
+    if score < min_score:
+        return None
+    return {
+        "score": score,
+        "reasons": reasons,
+        "a": _candidate(a.source, a.key, score, reasons, a),
+        "b": _candidate(b.source, b.key, score, reasons, b),
+    }
+
+
+def _report_truncated(block: list[PersonKeys], truncated: list[dict] | None) -> None:
+    first = block[0]
+    report = {
+        "birth_date": first.birth_date,
+        "name_phonetic": first.name_phonetic,
+        "last_name_key": first.last_name_key,
+        "rows": len(block),
+        "scored": _MAX_BLOCK,
+    }
+    logger.warning("Duplicate scan: block %s has %d rows; only the first %d were compared", report, len(block),
+                   _MAX_BLOCK)
+    if truncated is not None:
+        truncated.append(report)
+
+
+def _pairs_in_block(
+    block: list[PersonKeys], min_score: float, truncated: list[dict] | None = None, depth: int = 0
+) -> Iterator[dict]:
+    if len(block) > _MAX_BLOCK:
+        if depth < len(_SPLIT_KEYS):
+            key = _SPLIT_KEYS[depth]
+            block = sorted(block, key=lambda p: getattr(p, key) or "")
+            for _, sub in groupby(block, key=lambda p: getattr(p, key)):
+                sub = list(sub)
+                if len(sub) > 1:
+                    yield from _pairs_in_block(sub, min_score, truncated, depth + 1)
+            return
+        _report_truncated(block, truncated)
+        block = block[:_MAX_BLOCK]
+    for a, b in combinations(block, 2):
+        pair = _pair(a, b, min_score)
+        if pair is not None:
+            yield pair
+
+
+def _undated_pairs_in_block(
+    block: list[PersonKeys], min_score: float, truncated: list[dict] | None = None
+) -> Iterator[dict]:
+    """
+    Pairs of a name_phonetic block involving a row without birth_date: the undated rows among themselves, and
+    each against the dated rows (a legacy record often lacks the birth date its duplicate has). Dated pairs are
+    left to the birth_date pass. Dated rows too many to compare are narrowed to the same last_name_key.
+    """
+    undated = [p for p in block if p.birth_date is None]
+    if not undated:
+        return
+    dated = [p for p in block if p.birth_date is not None]
+    if len(undated) > 1:
+        yield from _pairs_in_block(undated, min_score, truncated)
+    by_last_name: dict[str | None, list[PersonKeys]] = {}
+    if len(dated) > _MAX_BLOCK:
+        for person in dated:
+            by_last_name.setdefault(person.last_name_key, []).append(person)
+    reported: set[str | None] = set()
+    for person in undated:
+        others = by_last_name.get(person.last_name_key, []) if by_last_name else dated
+        if len(others) > _MAX_BLOCK:
+            if person.last_name_key not in reported:
+                reported.add(person.last_name_key)
+                _report_truncated(others, truncated)
+            others = others[:_MAX_BLOCK]
+        for other in others:
+            pair = _pair(person, other, min_score)
+            if pair is not None:
+                yield pair
+
+
+def scan_duplicates(
+    db: "Session", min_score: float = 0.85, chunk_size: int = 5000, truncated: list[dict] | None = None
+) -> Iterator[dict]:
+    """
+    Stream the whole of both tables ordered by blocking key, chunk_size rows per fetch, and yield candidate
+    pairs within each block: first by birth_date, then by name_phonetic for every pair involving a row without
+    a birth date. Blocks too large to compare even after splitting are logged and appended to truncated.
+    """
+    # Sorting both whole tables can outlast DB_STATEMENT_TIMEOUT; lifted until the caller's transaction ends
+    db.execute(text("SET LOCAL statement_timeout = 0"))
+    union = union_all(*(_person_select(*source) for source in _SOURCES)).subquery()
+    passes = (
+        (union.c.birth_date, union.c.birth_date.is_not(None), _pairs_in_block),
+        (union.c.name_phonetic, union.c.name_phonetic.is_not(None), _undated_pairs_in_block),
+    )
+    for block_column, condition, pairs_in_block in passes:
+        rows = db.execute(
+            select(union).where(condition).order_by(block_column, union.c.source, union.c.key),
+            execution_options={"stream_results": True, "yield_per": chunk_size},
+        )
+        for _, block in groupby((PersonKeys(*row) for row in rows), key=lambda p: getattr(p, block_column.name)):
+            block = list(block)
+            if len(block) > 1:
+                yield from pairs_in_block(block, min_score, truncated)
+
+
+_CSV_FIELDS = ("score", "reasons", "source_a", "id_a", "name_a", "birth_date_a", "source_b", "id_b", "name_b",
+               "birth_date_b")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Scan beneficiaries and applications for likely duplicates.")
+    parser.add_argument("--min-score", type=float, default=0.85, help="minimum pair score to report (0..1)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="rows fetched per round trip")
+    args = parser.parse_args()
+
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    writer = csv.writer(sys.stdout)
+    writer.writerow(_CSV_FIELDS)
+    pairs = 0
+    truncated: list[dict] = []
+    try:
+        for pair in scan_duplicates(db, args.min_score, args.chunk_size, truncated):
+            a, b = pair["a"], pair["b"]
+            writer.writerow((
+                pair["score"],
+                " ".join(pair["reasons"]),
+                a["source"], a["id"], f"{a['last_name']}, {a['first_name']}", a["birth_date"],
+                b["source"], b["id"], f"{b['last_name']}, {b['first_name']}", b["birth_date"],
+            ))
+            pairs += 1
+    finally:
+        db.close()
+    print(f"{pairs} candidate pairs in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    for block in truncated:
+        print(f"block not fully compared ({block['scored']} of {block['rows']} rows): birth_date={block['birth_date']} "
+              f"name_phonetic={block['name_phonetic']} last_name_key={block['last_name_key']}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
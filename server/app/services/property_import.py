@@ -0,0 +1,220 @@
+"""
+Bulk property (lot inventory) import from a project subdivision CSV.
+
+The file is read row by row and each row is validated against PropertyCreate and the column limits; valid rows
+are COPYed into a temp staging table every chunk_rows lines, and once the file is exhausted the staging table is
+merged into properties on geoid with one upsert (new lots inserted, changed lots updated, identical lots left
+alone). Only columns present in the CSV header are written, so a file carrying a few columns never blanks the
+others. The whole import is one transaction; rejected rows are reported with their line number and never stop
+the rest of the file.
+
+Usable from code (iter_property_import / import_properties_csv), via POST /api/v1/properties/import, or as a
+command from the server directory:
+
+    python -m app.services.property_import lots.csv [--chunk-rows 5000] [--rejects rejects.csv]
+"""
+
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+from decimal import Decimal
+from typing import TYPE_CHECKING, Iterator, TextIO
+
+from pydantic import ValidationError
+from sqlalchemy import Numeric, text
+
+from app.models.property import Property
+from app.schemas.property import PropertyCreate
+from app.services.address_import import copy_from_file
+from app.services.bulk_service import column_length_errors, validation_messages
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
+_STAGE = "stage_properties"
+_CHUNK_ROWS = 5000
+
+
+def _header_columns(header: list[str]) -> tuple[dict[str, int], list[str]]:
+    """({property column: position} for columns named in the header, header names that are not columns)."""
+    known = set(Property.__table__.c.keys())
+    names = [h.strip().lstrip("\ufeff") for h in header]
+    positions = {name: i for i, name in enumerate(names) if name in known}
+    if "geoid" not in positions:
+        raise ValueError("CSV header must include a geoid column")
+    if len(positions) != sum(1 for name in names if name in known):
+        raise ValueError("CSV header repeats a column")
+    return positions, [name for name in names if name and name not in known]
+
+
+def _numeric_errors(data: dict) -> list[str]:
+    """Decimals too large for their numeric(precision, scale) column; these would otherwise fail the COPY."""
+    errors = []
+    for field, value in data.items():
+        column_type = Property.__table__.c[field].type
+        if isinstance(value, Decimal) and isinstance(column_type, Numeric) and column_type.precision:
+            limit = Decimal(10) ** (column_type.precision - (column_type.scale or 0))
+            if abs(value) >= limit:
+                errors.append(f"{field}: must be less than {limit} in absolute value")
+    return errors
+
+
+def _copy_rows(db: "Session", columns: list[str], rows: list[list]) -> None:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        copy_from_file(cursor, f"COPY {_STAGE} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def _merge(db: "Session", columns: list[str]) -> tuple[int, int]:
+    """Upsert the staging table into properties on geoid, skipping identical rows. Returns (inserted, updated)."""
+    column_list = ", ".join(columns)
+    updates = [c for c in columns if c != "geoid"]
+    if updates:
+        assignments = ", ".join(f"{c} = EXCLUDED.{c}" for c in updates)
+        targets = ", ".join(f"properties.{c}" for c in updates)
+        incoming = ", ".join(f"EXCLUDED.{c}" for c in updates)
+        conflict = f"DO UPDATE SET {assignments} WHERE ROW({targets}) IS DISTINCT FROM ROW({incoming})"
+    else:
+        conflict = "DO NOTHING"
+    merged = db.execute(text(f"""
+        INSERT INTO properties ({column_list})
+        SELECT {column_list} FROM {_STAGE}
+        ON CONFLICT (geoid) {conflict}
+        RETURNING (xmax = 0) AS inserted
+    """)).all()
+    inserted = sum(1 for (was_insert,) in merged if was_insert)
+    return inserted, len(merged) - inserted
+
+
+def iter_property_import(db: "Session", f: TextIO, chunk_rows: int = _CHUNK_ROWS) -> Iterator[dict]:
+    """
+    Import a properties CSV (header row required, geoid mandatory), yielding events as it goes:
+    {"event": "start"} once the header is read, {"event": "progress"} with running counts and that chunk's
+    rejects ({line, geoid, errors}) every chunk_rows lines, and a final {"event": "done"} with the merge counts
+    after commit. Raises ValueError for an unusable header before anything is written; rolls back and re-raises
+    on database errors.
+    """
+    started = time.perf_counter()
+    chunk_rows = max(chunk_rows, 1)
+    reader = csv.reader(f)
+    positions, ignored = _header_columns(next(reader, []))
+    columns = list(positions)
+    yield {"event": "start", "columns": columns, "ignored_columns": ignored}
+
+    counts = {"read": 0, "staged": 0, "rejected": 0}
+    seen: dict[str, int] = {}
+    rows: list[list] = []
+    rejects: list[dict] = []
+
+    def progress() -> dict:
+        event = {"event": "progress", **counts, "rejects": rejects[:]}
+        rejects.clear()
+        return event
+
+    try:
+        # The COPYs and the merge are bulk statements; DB_STATEMENT_TIMEOUT is for request queries
+        db.execute(text("SET LOCAL statement_timeout = 0"))
+        db.execute(text(f"CREATE TEMP TABLE {_STAGE} (LIKE properties) ON COMMIT DROP"))
+        for record in reader:
+            if not any(value.strip() for value in record):
+                continue
+            counts["read"] += 1
+            line = reader.line_num
+            raw = {
+                column: (record[i].strip() or None) if i < len(record) else None
+                for column, i in positions.items()
+            }
+            try:
+                data = PropertyCreate(**raw).model_dump(include=set(columns))
+                errors = column_length_errors(Property, data) + _numeric_errors(data)
+            except ValidationError as exc:
+                errors = validation_messages(exc)
+            if not errors and data["geoid"] in seen:
+                errors = [f"geoid: duplicate of line {seen[data['geoid']]}"]
+            if errors:
+                counts["rejected"] += 1
+                rejects.append({"line": line, "geoid": raw["geoid"], "errors": errors})
+            else:
+                seen[data["geoid"]] = line
+                rows.append([data[c] for c in columns])
+            if counts["read"] % chunk_rows == 0:
+                if rows:
+                    _copy_rows(db, columns, rows)
+                    counts["staged"] += len(rows)
+                    rows.clear()
+                yield progress()
+        if rows:
+            _copy_rows(db, columns, rows)
+            counts["staged"] += len(rows)
+        if rows or rejects:
+            yield progress()
+        inserted, updated = _merge(db, columns) if counts["staged"] else (0, 0)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    yield {
+        "event": "done",
+        **counts,
+        "inserted": inserted,
+        "updated": updated,
+        "unchanged": counts["staged"] - inserted - updated,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def import_properties_csv(db: "Session", f: TextIO, chunk_rows: int = _CHUNK_ROWS) -> dict:
+    """Run iter_property_import to completion; returns the final counts plus every reject and ignored column."""
+    report: dict = {}
+    rejects: list[dict] = []
+    for event in iter_property_import(db, f, chunk_rows):
+        rejects.extend(event.get("rejects", ()))
+        if event["event"] == "start":
+            report["ignored_columns"] = event["ignored_columns"]
+        elif event["event"] == "done":
+            report.update({k: v for k, v in event.items() if k != "event"})
+    report["rejects"] = rejects
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import/update properties (lots) from a subdivision CSV.")
+    parser.add_argument("file", type=argparse.FileType("r", encoding="utf-8-sig"), help="CSV with a geoid column")
+    parser.add_argument("--chunk-rows", type=int, default=_CHUNK_ROWS, help="lines validated per COPY chunk")
+    parser.add_argument("--rejects", type=argparse.FileType("w", encoding="utf-8"), help="write rejected lines here")
+    args = parser.parse_args()
+
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    writer = csv.writer(args.rejects) if args.rejects else None
+    if writer:
+        writer.writerow(("line", "geoid", "errors"))
+    try:
+        for event in iter_property_import(db, args.file, args.chunk_rows):
+            if event["event"] == "start" and event["ignored_columns"]:
+                print(f"ignoring columns: {', '.join(event['ignored_columns'])}", file=sys.stderr)
+            elif event["event"] == "progress":
+                print(f"{event['read']} read, {event['staged']} staged, {event['rejected']} rejected", file=sys.stderr)
+                if writer:
+                    writer.writerows((r["line"], r["geoid"], "; ".join(r["errors"])) for r in event["rejects"])
+            elif event["event"] == "done":
+                del event["event"]
+                print(json.dumps(event, indent=2))
+    finally:
+        db.close()
+        args.file.close()
+        if args.rejects:
+            args.rejects.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Short-TTL cache for /search results, per entity type.
+
+Each entity type's hits are cached under search:{type}:g{generation}:{limit}:{phrase}. Writes to an entity
+bump that type's generation (Redis INCR when REDIS_URL is set, otherwise an in-process counter), so only the
+changed type is recomputed and stale keys simply expire. Without Redis each worker caches on its own and other
+workers may serve results up to SEARCH_CACHE_TTL seconds old.
+"""
+
+import json
+import threading
+from typing import Any
+
+from app.config import settings
+from app.redis_client import LocalCache, get_redis
+
+_local = LocalCache(settings.SEARCH_CACHE_MAXSIZE, settings.SEARCH_CACHE_TTL)
+_local_generations: dict[str, int] = {}
+
+_stats_lock = threading.Lock()
+_stats: dict[str, dict[str, int]] = {}
+
+
+def _count(entity_type: str, name: str) -> None:
+    with _stats_lock:
+        per_type = _stats.setdefault(entity_type, {"hits": 0, "misses": 0, "invalidations": 0})
+        per_type[name] += 1
+
+
+def normalize_phrase(phrase: str) -> str:
+    return " ".join((phrase or "").lower().split())
+
+
+def _key(entity_type: str, generation: int, phrase: str, limit: int) -> str:
+    return f"search:{entity_type}:g{generation}:{limit}:{phrase}"
+
+
+def get_cached(
+    entity_types: tuple[str, ...], phrase: str, limit: int, refresh: bool = False
+) -> tuple[dict[str, list[dict]], dict[str, str]]:
+    """
+    Look up cached hits. Returns (found, pending) where found maps entity type -> hits and pending maps each
+    missing entity type -> the key to store its fresh hits under (pass it to set_cached). refresh=True skips the
+    lookup and returns every type as pending, so fresh hits overwrite whatever is cached.
+    """
+    found: dict[str, list[dict]] = {}
+    r = get_redis()
+    if r is not None:
+        try:
+            generations = r.mget([f"search:gen:{t}" for t in entity_types])
+            keys = {t: _key(t, int(g or 0), phrase, limit) for t, g in zip(entity_types, generations)}
+            cached = [None] * len(keys) if refresh else r.mget(list(keys.values()))
+            for t, raw in zip(entity_types, cached):
+                if raw is not None:
+                    found[t] = json.loads(raw)
+        except Exception:
+            keys = {}
+        if keys:
+            for t in entity_types:
+                _count(t, "hits" if t in found else "misses")
+            return found, {t: keys[t] for t in entity_types if t not in found}
+
+    keys = {t: _key(t, _local_generations.get(t, 0), phrase, limit) for t in entity_types}
+    for t, key in keys.items():
+        hits = None if refresh else _local.get(key)
+        if hits is not None:
+            found[t] = hits
+        _count(t, "hits" if hits is not None else "misses")
+    return found, {t: keys[t] for t in entity_types if t not in found}
+
+
+def set_cached(pending: dict[str, str], results: dict[str, list[dict]]) -> None:
+    """Store fresh hits under the keys returned by get_cached."""
+    r = get_redis()
+    if r is not None:
+        try:
+            pipe = r.pipeline(transaction=False)
+            for t, key in pending.items():
+                pipe.set(key, json.dumps(results.get(t, [])), ex=settings.SEARCH_CACHE_TTL)
+            pipe.execute()
+            return
+        except Exception:
+            pass
+    for t, key in pending.items():
+        _local.set(key, results.get(t, []))
+
+
+def invalidate_search(entity_type: str) -> None:
+    """Drop cached search hits for one entity type (call after committing a create/update/delete)."""
+    _count(entity_type, "invalidations")
+    _local_generations[entity_type] = _local_generations.get(entity_type, 0) + 1
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        r.incr(f"search:gen:{entity_type}")
+    except Exception:
+        pass
+
+
+def search_cache_stats() -> dict[str, Any]:
+    """Per entity type hits/misses/invalidations and hit rate."""
+    with _stats_lock:
+        stats = {t: dict(v) for t, v in _stats.items()}
+    for per_type in stats.values():
+        lookups = per_type["hits"] + per_type["misses"]
+        per_type["hit_rate"] = round(per_type["hits"] / lookups, 4) if lookups else None
+    return {"backend": "redis" if get_redis() is not None else "local", "types": stats}
@@ -0,0 +1,133 @@
+"""
+Global search over projects, programs, applications and beneficiaries.
+
+Reads only the denormalized search_index table, which database triggers keep in sync with the four entity
+tables (migration 020). Text matches by substring on the normalized search_text (pg_trgm GIN index) and codes
+by case-insensitive prefix (text_pattern_ops indexes). Hits are ranked exact code > code prefix > trigram
+similarity, and all four entity types are fetched in a single UNION ALL statement.
+"""
+
+from typing import TYPE_CHECKING
+
+from sqlalchemy import case, func, or_, select, text, union_all
+
+from app.models.search_index import SearchIndex
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
+ENTITY_TYPES = ("projects", "programs", "applications", "beneficiaries")
+
+# Entities whose "extra" column is a second searchable code (beneficiaries.common_code)
+_EXTRA_IS_CODE = {"beneficiaries"}
+
+
+def escape_like(value: str) -> str:
+    """value with LIKE metacharacters escaped (use with escape="\\\\")."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _branch(entity_type: str, phrase: str, limit: int):
+    """One ranked, limited SELECT over search_index for a single entity type."""
+    escaped = escape_like(phrase)
+    prefix = f"{escaped.lower()}%"
+    lowered = phrase.lower()
+    normalized = func.search_normalize(phrase)
+
+    code_columns = [SearchIndex.code] + ([SearchIndex.extra] if entity_type in _EXTRA_IS_CODE else [])
+    conditions = [func.lower(c).like(prefix, escape="\\") for c in code_columns]
+    conditions.append(SearchIndex.search_text.like("%" + func.search_normalize(escaped) + "%", escape="\\"))
+
+    ranks = [
+        case((func.lower(c) == lowered, 3.0), (func.lower(c).like(prefix, escape="\\"), 2.0), else_=0.0)
+        for c in code_columns
+    ]
+    ranks.append(func.similarity(SearchIndex.search_text, normalized))
+    rank = func.greatest(*ranks).label("rank")
+
+    return (
+        select(
+            SearchIndex.entity_type,
+            SearchIndex.entity_key,
+            SearchIndex.code,
+            SearchIndex.title,
+            SearchIndex.subtitle,
+            SearchIndex.extra,
+            rank,
+        )
+        .where(SearchIndex.entity_type == entity_type)
+        .where(~SearchIndex.deleted)
+        .where(or_(*conditions))
+        .order_by(rank.desc())
+        .limit(limit)
+        .subquery(entity_type)
+    )
+
+
+def search_entities(
+    db: "Session",
+    phrase: str,
+    limit_per_type: int,
+    entity_types: tuple[str, ...] = ENTITY_TYPES,
+) -> dict[str, list[dict]]:
+    """
+    Ranked non-deleted matches per entity type in one UNION ALL round trip, projecting only the columns the
+    search dropdown shows. Returns {"projects", "programs", "applications", "beneficiaries"} of plain dicts
+    (only the requested entity_types).
+    """
+    if not entity_types:
+        return {}
+    branches = [_branch(entity_type, phrase, limit_per_type) for entity_type in entity_types]
+    query = union_all(*(select(branch) for branch in branches)) if len(branches) > 1 else select(branches[0])
+    ranked: dict[str, list[tuple[float, dict]]] = {entity_type: [] for entity_type in entity_types}
+    for row in db.execute(query).mappings():
+        ranked[row["entity_type"]].append((row["rank"], _to_hit(row)))
+    return {
+        entity_type: [hit for _, hit in sorted(hits, key=lambda pair: pair[0], reverse=True)]
+        for entity_type, hits in ranked.items()
+    }
+
+
+def _to_hit(row) -> dict:
+    entity_type = row["entity_type"]
+    if entity_type == "projects":
+        return {"project_code": row["entity_key"], "project_name": row["title"]}
+    if entity_type == "programs":
+        return {"project_prog_id": int(row["entity_key"]), "mc_ref": row["code"]}
+    if entity_type == "applications":
+        return {
+            "app_id": row["entity_key"],
+            "prequalification_no": row["code"],
+            "last_name": row["title"],
+            "first_name": row["subtitle"],
+        }
+    return {
+        "id": int(row["entity_key"]),
+        "bin": row["code"],
+        "last_name": row["title"],
+        "first_name": row["subtitle"],
+        "common_code": row["extra"],
+    }
+
+
+def rebuild_search_index(db: "Session") -> int:
+    """Repopulate search_index from the entity tables (search_index_rebuild() in migration 020). Returns rows."""
+    # One statement rewriting the whole table: DB_STATEMENT_TIMEOUT is sized for request queries, not this
+    db.execute(text("SET LOCAL statement_timeout = 0"))
+    count = db.execute(text("SELECT search_index_rebuild()")).scalar_one()
+    db.commit()
+    return int(count)
+
+
+def main() -> None:
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        print(f"search_index rebuilt: {rebuild_search_index(db)} rows")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark the partial deleted_at IS NULL indexes from migration 022 on the queries the routers run.
+
+From the server directory, against a database upgraded to 022 or later:
+
+    python -m scripts.bench_soft_delete_indexes [--runs 5]
+
+Each query is EXPLAIN ANALYZEd twice: as-is, and inside a rolled-back transaction with the 022 indexes dropped
+(the "before" plan). Dropping an index locks its table, so point this at a copy of the data, not production.
+"""
+
+import argparse
+import importlib.util
+import json
+import statistics
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from app.database import SessionLocal
+from app.models.application import Application
+from app.models.beneficiary import Beneficiary
+from app.models.program import Program
+
+
+def _migration_indexes() -> list[str]:
+    """Index names created by migration 022, read from the migration itself so the two cannot drift."""
+    path = next((Path(__file__).resolve().parent.parent / "alembic" / "versions").glob("022_*.py"))
+    spec = importlib.util.spec_from_file_location("migration_022", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return [name for name, _table, _columns in module._INDEXES]
+
+
+def _queries(db) -> list[tuple[str, object]]:
+    """(label, ORM query) pairs mirroring router reads, parameterized with values present in the data."""
+    person = db.query(
+        Beneficiary.last_name, Beneficiary.first_name, Beneficiary.region_code, Beneficiary.province_code,
+        Beneficiary.municipal_code,
+    ).filter(Beneficiary.deleted_at.is_(None)).first()
+    live = Beneficiary.deleted_at.is_(None)
+    return [
+        (
+            "beneficiaries by name",
+            db.query(Beneficiary).filter(live, Beneficiary.last_name == person.last_name,
+                                         Beneficiary.first_name == person.first_name)
+            .order_by(Beneficiary.last_name, Beneficiary.first_name).limit(100),
+        ),
+        (
+            "applications newest first",
+            db.query(Application).filter(Application.deleted_at.is_(None))
+            .order_by(Application.created_at.desc()).limit(100),
+        ),
+        (
+            "applications by name",
+            db.query(Application).filter(Application.deleted_at.is_(None),
+                                          Application.last_name == person.last_name).limit(100),
+        ),
+        (
+            "beneficiaries by municipality",
+            db.query(Beneficiary).filter(live, Beneficiary.region_code == person.region_code,
+                                         Beneficiary.province_code == person.province_code,
+                                         Beneficiary.municipal_code == person.municipal_code)
+            .order_by(Beneficiary.id).limit(101),
+        ),
+        (
+            "programs pending approval",
+            db.query(Program).filter(Program.deleted_at.is_(None), Program.approval_status == "pending_approval")
+            .order_by(Program.project_prog_id).limit(101),
+        ),
+    ]
+
+
+def _plan_summary(plan: dict) -> str:
+    nodes = []
+    while plan:
+        label = plan["Node Type"]
+        if "Index Name" in plan:
+            label += f" using {plan['Index Name']}"
+        nodes.append(label)
+        children = plan.get("Plans") or []
+        plan = children[0] if children else None
+    return " > ".join(nodes)
+
+
+def _explain(db, sql: str, runs: int) -> tuple[str, float]:
+    timings, summary = [], ""
+    for _ in range(runs):
+        result = db.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}")).scalar_one()
+        doc = (json.loads(result) if isinstance(result, str) else result)[0]
+        timings.append(doc["Execution Time"])
+        summary = _plan_summary(doc["Plan"])
+    return summary, statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare plans with and without the migration 022 indexes.")
+    parser.add_argument("--runs", type=int, default=5, help="EXPLAIN ANALYZE runs per query (median reported)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        compiled = [
+            (label, str(q.statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})))
+            for label, q in _queries(db)
+        ]
+        after = {label: _explain(db, sql, args.runs) for label, sql in compiled}
+        db.rollback()
+        for name in _migration_indexes():
+            db.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        before = {label: _explain(db, sql, args.runs) for label, sql in compiled}
+        db.rollback()
+    finally:
+        db.close()
+
+    for label, _ in compiled:
+        (plan_before, ms_before), (plan_after, ms_after) = before[label], after[label]
+        print(label)
+        print(f"  before {ms_before:9.2f} ms  {plan_before}")
+        print(f"  after  {ms_after:9.2f} ms  {plan_after}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Load test for the read routes: throughput and latency percentiles under concurrent clients.
+
+Start the API (e.g. uvicorn app.main:app --workers 1) once with DATABASE_ASYNC=false and once with
+DATABASE_ASYNC=true, and run this from the server directory against each. Run it from another host than the API
+and Postgres (or at least other CPUs): on a shared core the client's own threads skew both runs alike.
+
+    python -m scripts.load_test_reads [--url http://127.0.0.1:8000] [--concurrency 64] [--duration 20]
+
+Each client thread keeps one HTTP/1.1 connection open and cycles through the read paths (search with distinct
+phrases so the result cache does not absorb the load, list pages with and without filters). Only the standard
+library is used, so the numbers include no client-side framework overhead beyond http.client.
+"""
+
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+from itertools import cycle
+from urllib.parse import urlsplit
+
+_PATHS = (
+    "/api/v1/search/?q={word}&limit=5",
+    "/api/v1/beneficiaries/?limit=50",
+    "/api/v1/projects/?limit=50&include_total=true",
+    "/api/v1/applications/?limit=50",
+    "/api/v1/projects/?limit=20&project_name={word}",
+    "/api/v1/projects/?limit=50&region_code={region}",
+    "/api/v1/programs/?limit=50",
+)
+# Rotated through the {word} slots; distinct phrases keep most search requests off the result cache
+_WORDS = ("santos", "reyes", "cruz", "garcia", "mendoza", "torres", "flores", "ramos", "villanueva", "bautista",
+          "gonzales", "aquino", "castillo", "rivera", "fernandez", "navarro", "dela", "lopez", "perez", "santiago")
+# PSGC region codes rotated through the {region} slot
+_REGIONS = ("01", "02", "03", "04", "05", "06", "07", "08", "09", "10", "11", "12", "13", "14", "15", "16", "17")
+
+
+def _client(url: str, paths: tuple, deadline: float, offset: int, latencies: list, errors: list) -> None:
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    words = _WORDS[offset:] + _WORDS[:offset]
+    requests = cycle([(p, w, _REGIONS[i % len(_REGIONS)]) for i, w in enumerate(words) for p in paths])
+    while time.perf_counter() < deadline:
+        path, word, region = next(requests)
+        started = time.perf_counter()
+        try:
+            conn.request("GET", path.format(word=word, region=region))
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors.append(response.status)
+                continue
+        except (OSError, http.client.HTTPException) as exc:
+            errors.append(type(exc).__name__)
+            conn.close()
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - started)
+    conn.close()
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run(url: str, concurrency: int, duration: float, search: bool = True) -> dict:
+    paths = _PATHS if search else tuple(p for p in _PATHS if not p.startswith("/api/v1/search/"))
+    latencies: list[float] = []
+    errors: list = []
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=_client, args=(url, paths, deadline, i % len(_WORDS), latencies, errors), daemon=True)
+        for i in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    ordered = sorted(latencies)
+    if not ordered:
+        return {"requests": 0, "errors": len(errors)}
+    return {
+        "concurrency": concurrency,
+        "requests": len(ordered),
+        "errors": len(errors),
+        "requests_per_s": round(len(ordered) / elapsed, 1),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 1),
+        "p50_ms": round(_percentile(ordered, 50) * 1000, 1),
+        "p95_ms": round(_percentile(ordered, 95) * 1000, 1),
+        "p99_ms": round(_percentile(ordered, 99) * 1000, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Concurrent load test of the search/list read routes.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="base URL of a running API")
+    parser.add_argument("--concurrency", type=int, default=64, help="client threads, one connection each")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds to run")
+    parser.add_argument("--no-search", action="store_true", help="list routes only (cold searches dominate small DBs)")
+    args = parser.parse_args()
+    print(json.dumps(run(args.url, args.concurrency, args.duration, not args.no_search), indent=2))
+
+
+if __name__ == "__main__":
+    main()